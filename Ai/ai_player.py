@@ -1,10 +1,11 @@
-import copy
 import random
 import sys
 import os
 import importlib.util
 from . import heuristics
 from . import minimax
+from . import parallel
+from .transposition import TranspositionTable
 # Dynamic import for pathfinding in Core folder
 pathfinding_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Core', 'pathfinding.py'))
 import importlib.util
@@ -14,7 +15,7 @@ spec.loader.exec_module(pathfinding)
 
 
 class AIPlayer:
-    def __init__(self, player, difficulty="easy"):
+    def __init__(self, player, difficulty="easy", time_limit=None, wall_radius=None, workers=None):
         self.player = player
         self.opponent = "P2" if player == "P1" else "P1"
         self.difficulty = difficulty
@@ -29,41 +30,144 @@ class AIPlayer:
         else:
             self.depth = 1  # default easy
 
-
-    def choose_action(self, board):
-        actions = self._generate_all_actions(board)
-
+        # Optional per-move budget in seconds: iterative deepening up to self.depth
+        self.time_limit = time_limit
+
+        # Optional wall pruning radius below the root (None searches every wall)
+        self.wall_radius = wall_radius
+
+        # Optional process count for root-parallel search at fixed depth
+        self.workers = workers
+
+        # Search state kept from one move to the next, cleared by reset():
+        # positions searched so far (see self.tt.stats() for hit rates),
+        # killer/history move-ordering tables and the last principal variation
+        self.tt = TranspositionTable()
+        self.killers = {}
+        self.history = {}
+        self.pv = []  # (zobrist_key, move) pairs
+
+        # Moves found while pondering, by position key (see ponder())
+        self.ponder_results = {}
+
+    def reset(self):
+        """
+        Forget all search state (call when a new game starts).
+        """
+        self.tt.clear()
+        self.killers = {}
+        self.history = {}
+        self.pv = []
+        self.ponder_results = {}
+
+    def ponder(self, board, stop_event):
+        """
+        Search during the opponent's turn until stop_event is set.
+        board is the position with the opponent to move (a private copy: it is
+        mutated while searching). The reply predicted by the last principal
+        variation is searched first, then every other reply. Each finished
+        search stores our move in self.ponder_results so choose_action can
+        answer at once; unfinished work still stays in the transposition table.
+        """
+        self.ponder_results = {}
         if self.difficulty == "easy":
-            return self._choose_greedy(board, actions)
+            return
+
+        replies = minimax.get_possible_moves(board, self.opponent)
+        expected = self._expected_move(board)
+        if expected in replies:
+            replies.remove(expected)
+            replies.insert(0, expected)
+
+        self.tt.new_search()
+        for reply in replies:
+            if stop_event.is_set():
+                return
+            board.apply(reply, validate=False, player=self.opponent)
+            try:
+                ctx = minimax.SearchContext(self.tt, wall_radius=self.wall_radius)
+                ctx.stop = stop_event
+                ctx.history = self.history
+                move, _ = minimax.search_root(
+                    board, self.player, self.depth, ctx, first_move=self._expected_move(board)
+                )
+                self.ponder_results[board.zobrist_key] = move
+            except minimax.SearchTimeout:
+                return
+            finally:
+                board.undo()
+
+    def choose_action(self, board, stop_event=None, on_progress=None):
+        """
+        Pick an action for the current position.
+        stop_event aborts the search (SearchTimeout is raised) and
+        on_progress(depth, nodes, best_move) receives progress updates;
+        both are ignored by the easy and the process-parallel modes.
+        """
+        if self.difficulty == "easy":
+            return self._choose_greedy(board, self._generate_all_actions(board))
 
         # Medium and Hard: minimax with alpha-beta
-        best_score = float("-inf") if self.player == "P1" else float("inf")
-        best_action = None
-        alpha = float('-inf')
-        beta = float('inf')
-
-        for action in actions:
-            simulated_board = self._simulate_action(board, action)
-            score = minimax.minimax_alpha_beta_quoridor(
-                simulated_board,
-                depth=self.depth - 1,
-                is_maximizing=(self.player == "P2"),  # opponent's turn
-                alpha=alpha,
-                beta=beta
+        # Reuse a search finished while pondering on the opponent's turn
+        move = self.ponder_results.get(board.zobrist_key)
+        self.ponder_results = {}
+        if move is not None and minimax.is_legal_move(board, self.player, move):
+            self.pv = minimax.principal_variation(board, self.tt, move, self.depth, self.player)
+            return self._to_action(move)
+
+        ctx = self._new_context()
+        first_move = self._expected_move(board)
+        if self.workers and self.time_limit is None:
+            # Killers and history come back from this process's part of the
+            # search only; the workers update their own copies
+            move, _, _ = parallel.parallel_search_root(
+                board, self.player, self.depth, self.workers, self.wall_radius,
+                ctx=ctx, first_move=first_move
+            )
+        elif self.time_limit is None:
+            ctx.stop = stop_event
+            ctx.on_progress = on_progress
+            move, _ = minimax.search_root(board, self.player, self.depth, ctx, first_move=first_move)
+        else:
+            ctx.stop = stop_event
+            ctx.on_progress = on_progress
+            move, _ = minimax.iterative_deepening(
+                board, self.player, self.time_limit, self.depth, ctx, first_move
             )
 
-            if self.player == "P1":
-                if score > best_score:
-                    best_score = score
-                    best_action = action
-                    alpha = max(alpha, best_score)
-            else:
-                if score < best_score:
-                    best_score = score
-                    best_action = action
-                    beta = min(beta, best_score)
-
-        return best_action
+        self.killers = ctx.killers
+        self.history = ctx.history
+        self.pv = minimax.principal_variation(board, self.tt, move, self.depth, self.player)
+        return self._to_action(move)
+
+    def _new_context(self):
+        # Search context seeded with what previous moves learned
+        self.tt.new_search()
+        ctx = minimax.SearchContext(self.tt, self.time_limit, self.wall_radius)
+
+        # Killers are stored per ply from the root; the root is normally two
+        # plies further on now (our move and the reply)
+        ctx.killers = {ply - 2: moves for ply, moves in self.killers.items() if ply >= 2}
+
+        # Age history scores so recent cutoffs weigh more
+        ctx.history = {move: score // 2 for move, score in self.history.items() if score > 1}
+        return ctx
+
+    def _expected_move(self, board):
+        # Move the previous principal variation predicted for this position
+        for key, move in self.pv:
+            if key == board.zobrist_key:
+                return move
+        return None
+
+    def _to_action(self, move):
+        # Convert a minimax move tuple to the action dict used by the GUI
+        if move is None:
+            return None
+        if move[0] == "move":
+            return {"type": "move", "to": move[1]}
+        _, x, y, orientation = move
+        return {"type": "wall", "x": x, "y": y, "orientation": orientation}
 
     # greedy heuristic for easy 
     def _choose_greedy(self, board, actions):
@@ -71,8 +175,9 @@ class AIPlayer:
         best_actions = []
 
         for action in actions:
-            simulated_board = self._simulate_action(board, action)
-            score = heuristics.heuristic(simulated_board)
+            board.apply(action, validate=False, player=self.player)
+            score = heuristics.heuristic(board)
+            board.undo()
 
             if score > best_score:
                 best_score = score
@@ -102,41 +207,24 @@ class AIPlayer:
         if board.walls_left[self.player] <= 0:
             return moves
 
-        for x in range(board.GRID_SIZE - 1):
-            for y in range(board.GRID_SIZE - 1):
-                for orientation in ("H", "V"):
-                    if board.can_place_wall(x, y, orientation):
-                        moves.append({
-                            "type": "wall",
-                            "x": x,
-                            "y": y,
-                            "orientation": orientation
-                        })
+        for x, y, orientation in board.legal_walls():
+            moves.append({
+                "type": "wall",
+                "x": x,
+                "y": y,
+                "orientation": orientation
+            })
         return moves
 
 
-    def _simulate_action(self, board, action):
-        new_board = copy.deepcopy(board)
-
-        if action["type"] == "move":
-            new_board.move_pawn(self.player, action["to"])
-        else:
-            new_board.place_wall(
-                self.player,
-                action["x"],
-                action["y"],
-                action["orientation"]
-            )
-
-        return new_board
-
-
     # checking that wall does not block paths
     def _wall_keeps_paths(self, board, x, y, orientation):
-        test_board = copy.deepcopy(board)
-        test_board.place_wall(self.player, x, y, orientation)
+        if not board.apply({"type": "wall", "x": x, "y": y, "orientation": orientation},
+                           player=self.player):
+            return False
 
-        ai_path_length = pathfinding.shortest_path(self.player, test_board)
-        opp_path_length = pathfinding.shortest_path(self.opponent, test_board)
+        ai_path_length = pathfinding.shortest_path(self.player, board)
+        opp_path_length = pathfinding.shortest_path(self.opponent, board)
+        board.undo()
 
         return ai_path_length != float('inf') and opp_path_length != float('inf')
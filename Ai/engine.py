@@ -0,0 +1,291 @@
+#=====================================================
+# Headless engine: UCI-like text protocol over stdin/stdout
+#======================================================
+"""
+Run with:  python -m Ai.engine
+
+Squares are written as a file letter and a rank number: column 0..8 is
+a..i, row 0..8 is 1..9, so P1 starts on e1 and P2 on e9. A pawn move is
+the target square ("e2"); a wall is its anchor square plus h or v ("e3h"),
+the same (row, col) anchor Board.place_wall takes.
+
+Commands:
+    uci                              identify, list options, answer uciok
+                                     (uqi / uqiok is accepted as an alias)
+    isready                          answer readyok
+    setoption name <Hash|WallRadius> value <v>
+    newgame                          forget the transposition table
+    position startpos [moves m1 m2 ...]
+    go [depth N] [movetime MS] [nodes N] [infinite]
+    stop                             end the running search
+    quit
+
+While searching the engine prints one line per completed depth:
+    info depth D score S nodes N nps N time MS pv m1 m2 ...
+(score is from the side to move's point of view) and finally
+    bestmove <move>          or    bestmove none    when there is no move.
+"""
+import sys
+import threading
+import time
+
+from Core.board import Board
+from Ai.minimax import (
+    MAX_DEPTH, SearchContext, get_possible_moves, iterative_deepening, principal_variation
+)
+from Ai.transposition import TranspositionTable
+
+ENGINE_NAME = "Quoridor Minimax"
+ENGINE_AUTHOR = "Quoridor-Game"
+
+DEFAULT_HASH_MB = 16
+GRID_SIZE = Board.GRID_SIZE
+FILES = "abcdefghi"
+
+
+#=====================================================
+# Move notation
+#======================================================
+def format_square(pos):
+    r, c = pos
+    return f"{FILES[c]}{r + 1}"
+
+
+def parse_square(text):
+    """
+    "e1" -> (0, 4). Raises ValueError for anything off the board.
+    """
+    if len(text) < 2 or text[0] not in FILES or not text[1:].isdigit():
+        raise ValueError(f"bad square: {text}")
+    r = int(text[1:]) - 1
+    if not 0 <= r < GRID_SIZE:
+        raise ValueError(f"bad square: {text}")
+    return r, FILES.index(text[0])
+
+
+def format_move(move):
+    """
+    Minimax move tuple -> text ("e2" or "e3h").
+    """
+    if move[0] == "move":
+        return format_square(move[1])
+    _, x, y, orientation = move
+    return format_square((x, y)) + orientation.lower()
+
+
+def parse_move(text):
+    """
+    Text -> minimax move tuple ('move', (r, c)) or ('wall', x, y, orientation).
+    """
+    text = text.strip().lower()
+    if text and text[-1] in "hv":
+        x, y = parse_square(text[:-1])
+        return ("wall", x, y, text[-1].upper())
+    return ("move", parse_square(text))
+
+
+def winner(board):
+    # Goal rows: P1 moves down to row 8, P2 up to row 0
+    if board.pawns["P1"][0] == GRID_SIZE - 1:
+        return "P1"
+    if board.pawns["P2"][0] == 0:
+        return "P2"
+    return None
+
+
+#=====================================================
+# Engine
+#======================================================
+class Engine:
+    """
+    Protocol state: the current position, the transposition table kept
+    between searches and the search thread, if one is running.
+    """
+
+    def __init__(self, out=None):
+        self.out = out if out is not None else sys.stdout
+        self.out_lock = threading.Lock()
+
+        self.board = Board()
+        self.hash_mb = DEFAULT_HASH_MB
+        self.tt = TranspositionTable(self.hash_mb)
+        self.wall_radius = None
+
+        self.search_thread = None
+        self.stop_event = None
+
+    def send(self, line):
+        with self.out_lock:
+            self.out.write(line + "\n")
+            self.out.flush()
+
+    # ===== Commands =====
+    def handle(self, line):
+        """
+        Execute one command line. Returns False once the engine should exit.
+        """
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+
+        if command in ("uci", "uqi"):
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send(f"option name Hash type spin default {DEFAULT_HASH_MB} min 1 max 4096")
+            self.send("option name WallRadius type spin default 0 min 0 max 8")
+            self.send("uqiok" if command == "uqi" else "uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "setoption":
+            self.stop()
+            self.set_option(args)
+        elif command == "newgame":
+            self.stop()
+            self.tt.clear()
+        elif command == "position":
+            self.stop()
+            self.set_position(args)
+        elif command == "go":
+            self.stop()
+            self.go(args)
+        elif command == "stop":
+            self.stop()
+        elif command == "quit":
+            self.stop()
+            return False
+        else:
+            self.send(f"info string unknown command: {command}")
+        return True
+
+    def set_option(self, args):
+        # setoption name <name> value <value>
+        if "name" not in args or "value" not in args:
+            self.send("info string usage: setoption name <name> value <value>")
+            return
+        name = " ".join(args[args.index("name") + 1:args.index("value")]).lower()
+        value = " ".join(args[args.index("value") + 1:])
+        try:
+            if name == "hash":
+                self.hash_mb = max(1, int(value))
+                self.tt = TranspositionTable(self.hash_mb)
+            elif name == "wallradius":
+                # 0 searches every wall
+                self.wall_radius = int(value) or None
+            else:
+                self.send(f"info string unknown option: {name}")
+        except ValueError:
+            self.send(f"info string bad value for {name}: {value}")
+
+    def set_position(self, args):
+        # position startpos [moves m1 m2 ...]
+        if not args or args[0] != "startpos":
+            self.send("info string usage: position startpos [moves m1 m2 ...]")
+            return
+        board = Board()
+        if len(args) > 1 and args[1] == "moves":
+            for text in args[2:]:
+                try:
+                    move = parse_move(text)
+                except ValueError as error:
+                    self.send(f"info string {error}")
+                    break
+                if winner(board) is not None or not board.apply(move):
+                    self.send(f"info string illegal move: {text}")
+                    break
+        self.board = board
+
+    def go(self, args):
+        """
+        Start a search of the current position on a background thread.
+        """
+        max_depth, movetime, nodes = MAX_DEPTH, None, None
+        i = 0
+        while i < len(args):
+            name = args[i]
+            if name == "infinite":
+                i += 1
+                continue
+            try:
+                value = int(args[i + 1])
+            except (IndexError, ValueError):
+                self.send(f"info string bad go parameter: {name}")
+                return
+            if name == "depth":
+                max_depth = max(1, value)
+            elif name == "movetime":
+                movetime = value / 1000.0
+            elif name == "nodes":
+                nodes = value
+            else:
+                self.send(f"info string unknown go parameter: {name}")
+            i += 2
+
+        self.stop_event = threading.Event()
+        self.search_thread = threading.Thread(
+            target=self.search,
+            args=(self.board.copy(), max_depth, movetime, nodes, self.stop_event),
+            daemon=True
+        )
+        self.search_thread.start()
+
+    def stop(self):
+        """
+        Stop the running search (it still reports its bestmove) and wait for it.
+        """
+        if self.search_thread is not None:
+            self.stop_event.set()
+            self.search_thread.join()
+            self.search_thread = None
+
+    def wait(self):
+        """
+        Wait for the running search to finish on its own.
+        """
+        if self.search_thread is not None:
+            self.search_thread.join()
+            self.search_thread = None
+
+    # ===== Search =====
+    def search(self, board, max_depth, movetime, nodes, stop_event):
+        player = board.current_player
+        if winner(board) is not None or not get_possible_moves(board, player):
+            self.send("bestmove none")
+            return
+
+        self.tt.new_search()
+        ctx = SearchContext(self.tt, movetime, self.wall_radius)
+        ctx.stop = stop_event
+        ctx.max_nodes = nodes
+        start = time.monotonic()
+
+        def report(depth, best_move, best_value):
+            elapsed = time.monotonic() - start
+            score = best_value if player == "P1" else -best_value
+            pv = principal_variation(board, self.tt, best_move, depth)
+            self.send(
+                f"info depth {depth} score {round(score)} nodes {ctx.nodes} "
+                f"nps {int(ctx.nodes / elapsed) if elapsed > 0 else 0} "
+                f"time {int(elapsed * 1000)} pv {' '.join(format_move(move) for _, move in pv)}"
+            )
+
+        ctx.on_iteration = report
+        best_move, _ = iterative_deepening(board, player, movetime, max_depth, ctx)
+        self.send(f"bestmove {format_move(best_move) if best_move is not None else 'none'}")
+
+
+def main(stdin=None):
+    """
+    Read commands until quit or end of input. At end of input a running
+    search is allowed to finish, so piped scripts get their bestmove.
+    """
+    stdin = stdin if stdin is not None else sys.stdin
+    engine = Engine()
+    for line in stdin:
+        if not engine.handle(line):
+            return
+    engine.wait()
+
+
+if __name__ == "__main__":
+    main()
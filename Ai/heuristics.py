@@ -1,58 +1,32 @@
 
-import heapq
-def a_star_heuristic(curr_pos, goal_row):
-    """
-    Manhattan distance to the target row.
-    curr_pos = (r, c)
-    goal_row = integer row the player must reach
-    """
-    r, c = curr_pos
-    return abs(r - goal_row)
+from Core.pathfinding import distance_field, jump_distance
+
+# Pawns at most this many steps apart (Manhattan) can block or jump each
+# other soon, so their distances are computed with the jump rules
+JUMP_RANGE = 2
 
+# Extra step charged when the opponent's pawn is what blocks every path:
+# the pawn has to wait a turn for it to move away
+BLOCKED_TEMPO = 1
 
 
 def shortest_path(board, player):
     """
-    A* shortest path for a player's pawn to its goal line.
-    Returns length of shortest path.
+    Length of the shortest path for a player's pawn to its goal line.
+    Read from the player's goal distance field, or computed with jumps and
+    the opponent's pawn taken into account when the pawns are close.
+    The jump search holds the opponent still, so if it finds no path the
+    field distance plus BLOCKED_TEMPO is used instead.
     """
-
-    start = board.pawns[player]
-    goal_row = 8 if player == "P1" else 0  # P1 goes DOWN, P2 goes UP
-
-    visited = set()
-    pq = []  # priority queue
-
-    # (f_score, g_score, position)
-    heapq.heappush(pq, (a_star_heuristic(start, goal_row), 0, start))
-
-    while pq:
-        f_score, g_score, pos = heapq.heappop(pq)
-
-        if pos in visited:
-            continue
-        visited.add(pos)
-
-        r, c = pos
-
-        # Reached goal row
-        if r == goal_row:
-            return g_score
-
-        # Expand neighbors
-        for move in board.get_adjacent_positions(pos).values():
-            if not board.inside_board(move):
-                continue
-            if board.is_wall_blocking(pos, move):
-                continue
-                   
-            if move not in visited:
-                new_g = g_score + 1
-                new_f = new_g + a_star_heuristic(move, goal_row)
-                heapq.heappush(pq, (new_f, new_g, move))
-
-    # No path found (should never happen if walls allow path)
-    return float('inf')
+    r, c = board.pawns[player]
+    opp_r, opp_c = board.pawns["P2" if player == "P1" else "P1"]
+    field_dist = distance_field(board, player)[r * board.GRID_SIZE + c]
+    if abs(r - opp_r) + abs(c - opp_c) <= JUMP_RANGE:
+        dist = jump_distance(board, player)
+        if dist == float("inf"):
+            return field_dist + BLOCKED_TEMPO
+        return dist
+    return field_dist
 
 def heuristic(board):
     """
@@ -1,7 +1,21 @@
+import time
+
 from Ai.heuristics import heuristic
+from Core.board import WALL_EDGES
+from Core.pathfinding import distance_field, shortest_path_dag
+from Ai.transposition import TranspositionTable, EXACT, LOWER, UPPER
 #=====================================================
 # Minimax algorithm
 #======================================================
+# Upper bound for iterative deepening when only a time limit is given
+MAX_DEPTH = 64
+
+# Killer moves remembered per ply for move ordering
+KILLERS_PER_PLY = 2
+
+# Nodes between two reads of a bound shared with other processes
+SHARED_BOUND_INTERVAL = 64
+
 def is_game_over(board):
     """
     Check if the game is over.
@@ -31,10 +45,25 @@ def check_winner(board):
         return "Game not over"
 
 
-def minimax_alpha_beta_quoridor(board, depth, is_maximizing,alpha,beta):
+def minimax_alpha_beta_quoridor(board, depth, is_maximizing,alpha,beta, ctx=None):
     """
     Minimax algorithm for Quoridor
+    ctx: optional SearchContext (transposition table, deadline, node count)
     """
+    tt = None
+    entry_bound = None
+    if ctx is not None:
+        ctx.tick()
+        tt = ctx.tt
+        # Narrow the window with the root bound other processes share (see
+        # SearchContext.share_bound), as long as it stays non-empty
+        entry_bound = ctx.bound
+        if entry_bound is not None and alpha < entry_bound < beta:
+            if ctx.bound_is_alpha:
+                alpha = entry_bound
+            else:
+                beta = entry_bound
+
     # Base case - game is over
     if is_game_over(board):
         if board.pawns["P1"][1] == 8:
@@ -46,38 +75,239 @@ def minimax_alpha_beta_quoridor(board, depth, is_maximizing,alpha,beta):
     if depth == 0:
         return heuristic(board)
 
+    # Transposition table lookup
+    alpha_orig, beta_orig = alpha, beta
+    tt_move = None
+    if tt is not None:
+        entry = tt.probe(board.zobrist_key)
+        if entry is not None:
+            entry_depth, entry_value, entry_flag, tt_move = entry[1:5]
+            if entry_depth >= depth:
+                if entry_flag == EXACT:
+                    return entry_value
+                if entry_flag == LOWER:
+                    alpha = max(alpha, entry_value)
+                else:
+                    beta = min(beta, entry_value)
+                if beta <= alpha:
+                    return entry_value
+
+    player = "P1" if is_maximizing else "P2"
+
+    # Moves are generated lazily in stages (stored best move, killers,
+    # pawn steps, ordered walls) so a cutoff skips the remaining legality checks
+    ply = 0
+    if ctx is not None:
+        ply = ctx.root_depth - depth
+        moves = generate_moves(board, player, ctx, ply, tt_move)
+    else:
+        moves = get_possible_moves(board, player)
+
+    best_move = None
+
     # Maximizer (P1's turn)
     if is_maximizing:
         max_value = float('-inf')
-        moves = get_possible_moves(board, "P1")
 
         for move in moves:
-            new_board = board.copy()
-            apply_move(new_board, move, "P1")
-            value = minimax_alpha_beta_quoridor(new_board, depth - 1, False,alpha,beta)
-            max_value = max(max_value, value)
+            board.apply(move, validate=False, player=player)
+            value = minimax_alpha_beta_quoridor(board, depth - 1, False,alpha,beta, ctx)
+            board.undo()
+            if value > max_value:
+                max_value = value
+                best_move = move
 
             alpha =max(alpha, value)
             if beta<=alpha:
+                if ctx is not None:
+                    ctx.record_cutoff(move, depth, ply)
                 break
 
-        return max_value
+        best_value = max_value
 
     # Minimizer (P2's turn)
     else:
         min_value = float('inf')
-        moves = get_possible_moves(board, "P2")
 
         for move in moves:
-            new_board = board.copy()
-            apply_move(new_board, move, "P2")
-            value = minimax_alpha_beta_quoridor(new_board, depth - 1, True,alpha,beta)
-            min_value = min(min_value, value)
+            board.apply(move, validate=False, player=player)
+            value = minimax_alpha_beta_quoridor(board, depth - 1, True,alpha,beta, ctx)
+            board.undo()
+            if value < min_value:
+                min_value = value
+                best_move = move
             beta = min(beta,value)
             if beta<=alpha:
+                if ctx is not None:
+                    ctx.record_cutoff(move, depth, ply)
                 break
 
-        return min_value
+        best_value = min_value
+
+    # Store the result with its bound type, unless the shared bound moved
+    # meanwhile: nodes below may then have searched a narrower window
+    if tt is not None and best_move is not None and ctx.bound == entry_bound:
+        if best_value <= alpha_orig:
+            flag = UPPER
+        elif best_value >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        tt.store(board.zobrist_key, depth, best_value, flag, best_move)
+
+    return best_value
+
+
+def path_gain(board, player, field, new_pos):
+    """
+    How much closer to goal a pawn step to new_pos brings the player,
+    read from the player's distance field.
+    """
+    size = board.GRID_SIZE
+    r, c = board.pawns[player]
+    return field[r * size + c] - field[new_pos[0] * size + new_pos[1]]
+
+
+def order_moves(board, player, moves, ctx, ply, pv_move=None):
+    """
+    Sort moves so that likely cutoffs come first:
+      1. pv_move (previous iteration / transposition table best move)
+      2. killer moves of this ply
+      3. pawn steps that shorten the player's path to goal
+      4. walls that cut one of the opponent's shortest paths
+      5. everything else, by history score
+    """
+    opponent = "P2" if player == "P1" else "P1"
+    killers = ctx.killers.get(ply, ())
+    history = ctx.history
+    field = None
+    cut_edges = None
+
+    scored = []
+    for move in moves:
+        if move == pv_move:
+            score = 1e9
+        elif move in killers:
+            score = 1e8 - killers.index(move)
+        elif move[0] == 'move':
+            # One distance field gives the path gain of every pawn step
+            if field is None:
+                field = distance_field(board, player)
+            gain = path_gain(board, player, field, move[1])
+            score = 1e7 * gain + history.get(move, 0)
+        else:
+            if cut_edges is None:
+                cut_edges = shortest_path_dag(board, opponent)[1]
+            score = history.get(move, 0)
+            if WALL_EDGES[move[1:]] & cut_edges:
+                score += 1e6
+        scored.append((score, move))
+
+    # Stable sort keeps generation order between equal scores
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [move for _, move in scored]
+
+
+def is_legal_move(board, player, move):
+    """
+    Check a move (e.g. from the transposition table or killers) in this position.
+    """
+    if move[0] == 'move':
+        return board.is_valid_move(player, move[1])
+    _, x, y, orientation = move
+    return board.walls_left[player] > 0 and board.can_place_wall(x, y, orientation)
+
+
+def relevant_wall_anchors(board, radius):
+    """
+    Wall anchors (x, y) worth searching: a wall covers the four squares
+    (x..x+1, y..y+1); keep it if one of them is within radius squares
+    (Chebyshev distance) of either pawn or lies on one of either player's
+    shortest paths (see shortest_path_dag).
+    """
+    last = board.GRID_SIZE - 2
+    anchors = set()
+
+    def add_around(r, c, reach):
+        # Anchors whose squares include one within reach of (r, c)
+        for x in range(max(0, r - reach - 1), min(last, r + reach) + 1):
+            for y in range(max(0, c - reach - 1), min(last, c + reach) + 1):
+                anchors.add((x, y))
+
+    for player in ("P1", "P2"):
+        r, c = board.pawns[player]
+        add_around(r, c, radius)
+        for i in shortest_path_dag(board, player)[0]:
+            r, c = divmod(i, board.GRID_SIZE)
+            add_around(r, c, 0)
+    return anchors
+
+
+def generate_moves(board, player, ctx, ply, pv_move=None):
+    """
+    Staged move generator for the alpha-beta search. Yields, in order:
+      1. pv_move, if legal
+      2. legal killer moves of this ply
+      3. pawn moves, best path gain first
+      4. wall candidates ordered like order_moves(), restricted to
+         relevant_wall_anchors() when ctx.wall_radius is set; each wall's
+         legality is only checked right before it is yielded
+    The board must be back in the same position whenever the next move is requested.
+    """
+    opponent = "P2" if player == "P1" else "P1"
+    searched = []
+
+    # Stage 1: stored best move
+    if pv_move is not None and is_legal_move(board, player, pv_move):
+        searched.append(pv_move)
+        yield pv_move
+
+    # Stage 2: killers
+    for killer in list(ctx.killers.get(ply, ())):
+        if killer not in searched and is_legal_move(board, player, killer):
+            searched.append(killer)
+            yield killer
+
+    # Stage 3: pawn moves
+    history = ctx.history
+    pawn_moves = []
+    field = None
+    for new_pos in board.get_adjacent_positions(board.pawns[player]).values():
+        move = ('move', new_pos)
+        if move in searched or not board.is_valid_move(player, new_pos):
+            continue
+        if field is None:
+            field = distance_field(board, player)
+        gain = path_gain(board, player, field, new_pos)
+        pawn_moves.append((1e7 * gain + history.get(move, 0), move))
+    pawn_moves.sort(key=lambda item: item[0], reverse=True)
+    for _, move in pawn_moves:
+        yield move
+
+    # Stage 4: walls, ordered before any legality check
+    if board.walls_left[player] <= 0:
+        return
+    relevant = None
+    if ctx.wall_radius is not None:
+        relevant = relevant_wall_anchors(board, ctx.wall_radius)
+    cut_edges = shortest_path_dag(board, opponent)[1]
+    walls = []
+    for x in range(board.GRID_SIZE - 1):
+        for y in range(board.GRID_SIZE - 1):
+            if relevant is not None and (x, y) not in relevant:
+                continue
+            for orientation in ("H", "V"):
+                move = ('wall', x, y, orientation)
+                if move in searched:
+                    continue
+                score = history.get(move, 0)
+                if WALL_EDGES[(x, y, orientation)] & cut_edges:
+                    score += 1e6
+                walls.append((score, move))
+    walls.sort(key=lambda item: item[0], reverse=True)
+    for _, move in walls:
+        if board.can_place_wall(move[1], move[2], move[3]):
+            yield move
 
 
 def get_possible_moves(board, player):
@@ -92,15 +322,10 @@ def get_possible_moves(board, player):
         if board.is_valid_move(player, new_pos):
             moves.append(('move', new_pos))
 
-    # 2. Wall placements
+    # 2. Wall placements (legality of all walls computed in one pass)
     if board.walls_left[player] > 0:
-        for x in range(board.GRID_SIZE - 1):
-            for y in range(board.GRID_SIZE - 1):
-                if board.can_place_wall(x, y, 'H'):
-                    moves.append(('wall', x, y, 'H'))
-
-                if board.can_place_wall(x, y, 'V'):
-                    moves.append(('wall', x, y, 'V'))
+        for x, y, orientation in board.legal_walls():
+            moves.append(('wall', x, y, orientation))
 
     return moves
 
@@ -118,68 +343,269 @@ def apply_move(board, move, player):
         board.place_wall(player, x, y, orientation)
 
 ############################# AI player #########################
-def get_best_move(board, player, difficulty="medium"):
+class SearchTimeout(Exception):
     """
-    Find the best move for the player using Minimax
+    Raised inside the search when the context's time budget is used up.
+    partial holds (best_move, best_value) of the interrupted root iteration
+    when at least its first move was fully searched, else None.
+    """
+    def __init__(self, partial=None):
+        super().__init__("search time budget exceeded")
+        self.partial = partial
 
-    Args:
-        board: current Board state
-        player: "P1" or "P2"
-        difficulty: "easy", "medium", "hard", "expert"
 
-    Returns:
-        best_move: the best move to make
-        best_score: the score of that move
+class SearchContext:
     """
+    State shared by one search: transposition table, deadline and node count.
+    """
+    def __init__(self, tt=None, time_limit=None, wall_radius=None):
+        self.tt = tt
+        self.deadline = None if time_limit is None else time.monotonic() + time_limit
+        self.nodes = 0
+        self.completed_depth = 0
+
+        # Optional event (threading/multiprocessing) that aborts the search when set
+        self.stop = None
+
+        # Optional callback on_progress(depth, nodes, best_move) called as root moves finish
+        self.on_progress = None
+
+        # Optional callback on_iteration(depth, best_move, best_value) called
+        # when iterative deepening completes a depth
+        self.on_iteration = None
+
+        # Optional node budget; the search stops once this many nodes were visited
+        self.max_nodes = None
+
+        # Optional wall pruning below the root: only walls within this many
+        # squares of a pawn or touching a player's path are searched
+        self.wall_radius = wall_radius
+
+        # Move ordering state, kept across iterative-deepening iterations
+        self.root_depth = 0
+        self.killers = {}  # ply -> up to KILLERS_PER_PLY moves that caused cutoffs
+        self.history = {}  # move -> accumulated cutoff bonus
+
+        # Optional root bound shared with other processes (see share_bound):
+        # the multiprocessing.Value, its last value read and whether it is
+        # an alpha (root player P1) or a beta (P2)
+        self.shared_bound = None
+        self.bound = None
+        self.bound_is_alpha = True
+
+    def share_bound(self, shared_bound, is_maximizing):
+        """
+        Narrow every node's window with a root bound that other processes
+        improve while this search runs; re-read every SHARED_BOUND_INTERVAL nodes.
+        """
+        self.shared_bound = shared_bound
+        self.bound_is_alpha = is_maximizing
+        self.bound = shared_bound.value
+
+    def tick(self):
+        """
+        Count a node and stop the search once the deadline has passed,
+        the node budget is spent or the stop event is set.
+        """
+        self.nodes += 1
+        if self.shared_bound is not None and self.nodes % SHARED_BOUND_INTERVAL == 0:
+            self.bound = self.shared_bound.value
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise SearchTimeout()
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise SearchTimeout()
+        if self.stop is not None and self.stop.is_set():
+            raise SearchTimeout()
+
+    def report(self, depth, best_move):
+        if self.on_progress is not None:
+            self.on_progress(depth, self.nodes, best_move)
+
+    def record_cutoff(self, move, depth, ply):
+        """
+        Remember a move that caused a beta cutoff (killer + history bonus).
+        """
+        killers = self.killers.setdefault(ply, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[KILLERS_PER_PLY:]
+        self.history[move] = self.history.get(move, 0) + depth * depth
+
+
+def depth_for_difficulty(difficulty):
     # Set depth based on difficulty
     if difficulty == "easy":
-        depth = 1  # Very fast, weak AI
+        return 1  # Very fast, weak AI
     elif difficulty == "medium":
-        depth = 3  # Balanced
+        return 3  # Balanced
     elif difficulty == "hard":
-        depth = 4  # Strong, a bit slower
+        return 4  # Strong, a bit slower
     elif difficulty == "expert":
-        depth = 5  # Very strong, slower
-    else:
-        depth = 3  # Default to medium
+        return 5  # Very strong, slower
+    return 3  # Default to medium
 
-    # Determine if maximizing or minimizing
+
+def search_root(board, player, depth, ctx, moves=None, first_move=None):
+    """
+    Search every root move to the given depth with alpha-beta.
+    Moves are ordered with order_moves(); first_move (e.g. the previous
+    iteration's best) is searched first.
+    The board is restored even if the search is interrupted.
+
+    Returns:
+        (best_move, best_value)
+    """
     is_maximizing = (player == "P1")
+    if moves is None:
+        moves = get_possible_moves(board, player)
+    ctx.root_depth = depth
+    moves = order_moves(board, player, moves, ctx, 0, first_move)
 
     # Initialize best value
     if is_maximizing:
         best_value = float('-inf')
     else:
         best_value = float('inf')
-
     best_move = None
 
-    # Get all possible moves
-    possible_moves = get_possible_moves(board, player)
-
     # Initialize alpha and beta
     alpha = float('-inf')
     beta = float('inf')
 
-    # Try each move
-    for move in possible_moves:
-        # Copy board and apply move
-        new_board = board.copy()
-        apply_move(new_board, move, player)
+    history_len = len(board.history)
+    try:
+        # Try each move
+        for move in moves:
+            # Make the move in place
+            board.apply(move, validate=False, player=player)
+
+            # Evaluate this move using minimax
+            value = minimax_alpha_beta_quoridor(board, depth - 1, not is_maximizing,alpha,beta, ctx)
+
+            # Unmake it
+            board.undo()
+
+            # Update best move if better
+            if is_maximizing:
+                if value > best_value:
+                    best_value = value
+                    best_move = move
+                    alpha = max(alpha, best_value)  # Update alpha
+            else:
+                if value < best_value:
+                    best_value = value
+                    best_move = move
+                    beta = min(beta, best_value)  # Update beta
+
+            ctx.report(depth, best_move)
+    except SearchTimeout as timeout:
+        # Unwind the moves left on the board by the interrupted search
+        while len(board.history) > history_len:
+            board.undo()
+        if best_move is not None:
+            timeout.partial = (best_move, best_value)
+        raise
+
+    return best_move, best_value
+
+
+def iterative_deepening(board, player, time_limit, max_depth=MAX_DEPTH, ctx=None, first_move=None):
+    """
+    Search depth 1, 2, 3... until time_limit seconds have passed (None: no
+    limit, e.g. when ctx has a node budget or stop event) or max_depth
+    is completed. Returns the best move of the last completed iteration, or of
+    the interrupted one if it already improved on the previous best move
+    (which it always searches first). first_move seeds the first iteration.
+
+    Returns:
+        (best_move, best_value)
+    """
+    if ctx is None:
+        ctx = SearchContext(TranspositionTable(), time_limit)
+    elif ctx.deadline is None and time_limit is not None:
+        ctx.deadline = time.monotonic() + time_limit
+
+    moves = get_possible_moves(board, player)
+    if not moves:
+        return None, heuristic(board)
+
+    # Fallback if not even depth 1 completes in time
+    best_move, best_value = moves[0], None
+    if first_move in moves:
+        best_move = first_move
+
+    for depth in range(1, max_depth + 1):
+        try:
+            best_move, best_value = search_root(board, player, depth, ctx, moves, best_move)
+        except SearchTimeout as timeout:
+            if timeout.partial is not None:
+                best_move, best_value = timeout.partial
+            break
+        ctx.completed_depth = depth
+        if ctx.on_iteration is not None:
+            ctx.on_iteration(depth, best_move, best_value)
+
+    return best_move, best_value
+
+
+def principal_variation(board, tt, first_move, max_length, player=None):
+    """
+    Follow stored best moves through the transposition table from first_move,
+    played by player (default: the current player), then alternating.
+    Returns a list of (zobrist_key, move) pairs, each key being the position
+    the move is played from. The board is left unchanged.
+    """
+    pv = []
+    move = first_move
+    mover = player if player is not None else board.current_player
+    while move is not None and len(pv) < max_length:
+        if not is_legal_move(board, mover, move):
+            break
+        pv.append((board.zobrist_key, move))
+        board.apply(move, validate=False, player=mover)
+        mover = "P2" if mover == "P1" else "P1"
+        entry = tt.probe(board.zobrist_key) if tt is not None else None
+        move = entry[4] if entry is not None else None
+
+    for _ in pv:
+        board.undo()
+    return pv
+
+
+def get_best_move(board, player, difficulty="medium", tt=None, time_limit=None, wall_radius=None,
+                  workers=None):
+    """
+    Find the best move for the player using Minimax
+
+    Args:
+        board: current Board state
+        player: "P1" or "P2"
+        difficulty: "easy", "medium", "hard", "expert"
+        tt: TranspositionTable to reuse (a fresh one is used if None)
+        time_limit: seconds per move; if set, iterative deepening is used
+            with the difficulty depth as the maximum
+        wall_radius: if set, prune wall candidates below the root to those
+            near a pawn or a path (see relevant_wall_anchors)
+        workers: if set (and no time_limit), root moves are searched on a
+            process pool of this size (see Ai.parallel); tt then serves the
+            part of the search run in this process, workers use their own
+
+    Returns:
+        best_move: the best move to make
+        best_score: the score of that move
+    """
+    depth = depth_for_difficulty(difficulty)
 
-        # Evaluate this move using minimax
-        value = minimax_alpha_beta_quoridor(new_board, depth - 1, not is_maximizing,alpha,beta)
+    if tt is None:
+        tt = TranspositionTable()
 
-        # Update best move if better
-        if is_maximizing:
-            if value > best_value:
-                best_value = value
-                best_move = move
-                alpha = max(alpha, best_value)  # Update alpha
-        else:
-            if value < best_value:
-                best_value = value
-                best_move = move
-                beta = min(beta, best_value)  # Update alpha
+    ctx = SearchContext(tt, time_limit, wall_radius)
+    if workers and time_limit is None:
+        from Ai.parallel import parallel_search_root
+        best_move, best_value, _ = parallel_search_root(board, player, depth, workers, wall_radius, ctx=ctx)
+        return best_move, best_value
+
+    if time_limit is not None:
+        return iterative_deepening(board, player, time_limit, depth, ctx)
 
-    return best_move, best_value
\ No newline at end of file
+    return search_root(board, player, depth, ctx)
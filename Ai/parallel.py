@@ -0,0 +1,245 @@
+#=====================================================
+# Parallel minimax over a process pool (root splitting and Lazy-SMP)
+#======================================================
+import atexit
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from Ai.minimax import (
+    SearchContext, SearchTimeout, get_possible_moves, minimax_alpha_beta_quoridor,
+    order_moves, search_root
+)
+from Ai.transposition import TranspositionTable, SharedTranspositionTable
+
+# Per-worker state, set up by _init_worker
+_shared_bound = None
+_worker_tt = None
+_stop_event = None
+
+# Long-lived pool for parallel_search_root, reused from one move to the next
+# (see root_pool): (pool, shared bound, settings it was created with)
+_root_pool = None
+
+
+def _init_worker(shared_bound, tt_size_mb, shared_tt=None, stop_event=None):
+    global _shared_bound, _worker_tt, _stop_event
+    _shared_bound = shared_bound
+    _worker_tt = shared_tt if shared_tt is not None else TranspositionTable(tt_size_mb)
+    _stop_event = stop_event
+
+
+def _publish(value, is_maximizing):
+    # Raise the shared alpha (P1) / lower the shared beta (P2)
+    with _shared_bound.get_lock():
+        if is_maximizing and value > _shared_bound.value:
+            _shared_bound.value = value
+        elif not is_maximizing and value < _shared_bound.value:
+            _shared_bound.value = value
+
+
+def _search_root_move(board, player, depth, move, wall_radius, killers, history):
+    """
+    Worker task: search one root move, narrowing the window whenever another
+    worker publishes a better bound (see SearchContext.share_bound).
+    killers and history seed the worker's move ordering.
+    Returns (value, bound, nodes): value is exact if it beats bound, the
+    tightest bound the search may have used.
+    """
+    is_maximizing = (player == "P1")
+    ctx = SearchContext(_worker_tt, wall_radius=wall_radius)
+    ctx.root_depth = depth
+    ctx.killers = killers
+    ctx.history = history
+    ctx.share_bound(_shared_bound, is_maximizing)
+    if is_maximizing:
+        alpha, beta = ctx.bound, float('inf')
+    else:
+        alpha, beta = float('-inf'), ctx.bound
+
+    board.apply(move, validate=False, player=player)
+    value = minimax_alpha_beta_quoridor(board, depth - 1, not is_maximizing, alpha, beta, ctx)
+    board.undo()
+
+    # Only values strictly inside the window are exact and safe to share
+    bound = ctx.bound
+    if (is_maximizing and value > bound) or (not is_maximizing and value < bound):
+        _publish(value, is_maximizing)
+
+    return value, bound, ctx.nodes
+
+
+def root_pool(workers, tt_size_mb, shared_tt=None):
+    """
+    Return the (pool, shared_bound) used by parallel_search_root, starting
+    the worker processes only on first use or when the settings change.
+    Workers keep their transposition tables between moves.
+    """
+    global _root_pool
+    settings = (workers, tt_size_mb, shared_tt.name if shared_tt is not None else None)
+    if _root_pool is not None and _root_pool[2] == settings:
+        return _root_pool[0], _root_pool[1]
+
+    shutdown_root_pool()
+    shared_bound = multiprocessing.Value('d', 0.0)
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(shared_bound, tt_size_mb, shared_tt)
+    )
+    _root_pool = (pool, shared_bound, settings)
+    return pool, shared_bound
+
+
+def shutdown_root_pool():
+    """
+    Stop the worker processes of root_pool(), if running.
+    """
+    global _root_pool
+    if _root_pool is not None:
+        _root_pool[0].shutdown()
+        _root_pool = None
+
+
+atexit.register(shutdown_root_pool)
+
+
+def parallel_search_root(board, player, depth, workers=None, wall_radius=None, tt_size_mb=8,
+                         shared_tt=None, ctx=None, first_move=None):
+    """
+    Search the root moves of board in parallel on a ProcessPoolExecutor.
+
+    Root moves are ordered like the serial search_root, first_move (e.g. the
+    previous principal variation's move) first. That move is searched here
+    with a full window to set a bound; the rest are handed out one per task
+    to a pool kept alive between calls (see root_pool). Every finished move
+    that improves the best value raises the bound shared by all workers, and
+    running searches pick it up as they go, so they narrow their window
+    too. Moves whose result tied the best value only as a bound are
+    re-searched with a minimal window, so the move returned is the same one
+    the serial search picks at this depth.
+
+    ctx (a SearchContext) supplies the transposition table, killers and
+    history used in this process (ordering, the first move, re-searches)
+    and is updated by them; workers start from copies of its killers and
+    history but search with their own tables, or with shared_tt (a
+    SharedTranspositionTable) used by all of them.
+
+    Returns:
+        (best_move, best_value, nodes)
+    """
+    is_maximizing = (player == "P1")
+    moves = get_possible_moves(board, player)
+    if not moves:
+        return None, float('-inf') if is_maximizing else float('inf'), 0
+
+    if ctx is None:
+        ctx = SearchContext(TranspositionTable(tt_size_mb), wall_radius=wall_radius)
+    ctx.root_depth = depth
+    moves = order_moves(board, player, moves, ctx, 0, first_move)
+    start_nodes = ctx.nodes
+
+    # Search the first move serially so every worker starts with a real bound
+    open_bound = float('-inf') if is_maximizing else float('inf')
+    board.apply(moves[0], validate=False, player=player)
+    first_value = minimax_alpha_beta_quoridor(
+        board, depth - 1, not is_maximizing, float('-inf'), float('inf'), ctx
+    )
+    board.undo()
+    results = [(first_value, open_bound, 0)]
+
+    if len(moves) > 1:
+        pool, shared_bound = root_pool(workers or os.cpu_count() or 1, tt_size_mb, shared_tt)
+        with shared_bound.get_lock():
+            shared_bound.value = first_value
+        futures = [
+            pool.submit(_search_root_move, board, player, depth, move, wall_radius,
+                        ctx.killers, ctx.history)
+            for move in moves[1:]
+        ]
+        results += [future.result() for future in futures]
+    worker_nodes = sum(result[2] for result in results)
+
+    values = [result[0] for result in results]
+    best_value = max(values) if is_maximizing else min(values)
+
+    # The serial search keeps the first move (in order) whose true value is best
+    for move, (value, bound, _) in zip(moves, results):
+        if value != best_value:
+            continue
+        exact = value > bound if is_maximizing else value < bound
+        if not exact:
+            # value is only a bound; check whether the true value reaches best_value
+            if is_maximizing:
+                alpha, beta = math.nextafter(best_value, float('-inf')), float('inf')
+            else:
+                alpha, beta = float('-inf'), math.nextafter(best_value, float('inf'))
+            board.apply(move, validate=False, player=player)
+            value = minimax_alpha_beta_quoridor(board, depth - 1, not is_maximizing, alpha, beta, ctx)
+            board.undo()
+            if value != best_value:
+                continue
+        return move, best_value, ctx.nodes - start_nodes + worker_nodes
+
+    return moves[0], best_value, ctx.nodes - start_nodes + worker_nodes
+
+
+def _helper_search(board, player, depth, wall_radius):
+    """
+    Lazy-SMP helper task: search the whole position, filling the shared table,
+    until finished or told to stop. Returns the number of nodes searched.
+    """
+    ctx = SearchContext(_worker_tt, wall_radius=wall_radius)
+    ctx.stop = _stop_event
+    try:
+        search_root(board, player, depth, ctx)
+    except SearchTimeout:
+        pass
+    return ctx.nodes
+
+
+def lazy_smp_search(board, player, depth, workers=None, wall_radius=None, shared_tt=None,
+                    tt_size_mb=16):
+    """
+    Lazy-SMP search: helper processes search the same position (alternately
+    one ply deeper) while this process runs the main search, all sharing one
+    SharedTranspositionTable. Helpers stop as soon as the main search ends,
+    whose result is returned. A table passed in is left open for reuse
+    (e.g. by self-play workers sharing openings); otherwise one is created
+    and released here.
+
+    Returns:
+        (best_move, best_value, nodes)
+    """
+    owns_table = shared_tt is None
+    if owns_table:
+        shared_tt = SharedTranspositionTable(tt_size_mb)
+
+    helpers = (workers or os.cpu_count() or 1) - 1
+    ctx = SearchContext(shared_tt, wall_radius=wall_radius)
+    try:
+        if helpers <= 0:
+            best_move, best_value = search_root(board, player, depth, ctx)
+            return best_move, best_value, ctx.nodes
+
+        stop_event = multiprocessing.Event()
+        with ProcessPoolExecutor(
+            max_workers=helpers,
+            initializer=_init_worker,
+            initargs=(None, tt_size_mb, shared_tt, stop_event)
+        ) as pool:
+            futures = [
+                pool.submit(_helper_search, board, player, depth + i % 2, wall_radius)
+                for i in range(helpers)
+            ]
+            try:
+                best_move, best_value = search_root(board, player, depth, ctx)
+            finally:
+                stop_event.set()
+            nodes = ctx.nodes + sum(future.result() for future in futures)
+        return best_move, best_value, nodes
+    finally:
+        if owns_table:
+            shared_tt.close()
+            shared_tt.unlink()
@@ -0,0 +1,259 @@
+#=====================================================
+# Transposition table for minimax
+#======================================================
+import struct
+from multiprocessing import shared_memory
+
+
+# Bound types stored with each entry
+EXACT = 0
+LOWER = 1  # value is a lower bound (search failed high)
+UPPER = 2  # value is an upper bound (search failed low)
+
+# Rough size of one stored entry in CPython (tuple + ints + move tuple)
+APPROX_ENTRY_BYTES = 160
+
+
+class TranspositionTable:
+    """
+    Fixed-size table of searched positions keyed by Board.zobrist_key.
+
+    Each slot holds (key, depth, value, flag, best_move, generation). A slot is
+    chosen by key modulo the table size; on collision an entry left by an
+    earlier search (older generation, see new_search) is always replaced,
+    otherwise the deeper search is kept (depth-preferred replacement).
+    """
+
+    def __init__(self, size_mb=16):
+        self.size = max(1, int(size_mb * 1024 * 1024) // APPROX_ENTRY_BYTES)
+        self.slots = [None] * self.size
+
+        # Age of the current search; bumped by new_search()
+        self.generation = 0
+
+        # Statistics
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.replacements = 0
+
+    def probe(self, key):
+        """
+        Return the stored entry for key, or None.
+        """
+        self.probes += 1
+        entry = self.slots[key % self.size]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key, depth, value, flag, best_move):
+        index = key % self.size
+        old = self.slots[index]
+        if old is not None and old[0] != key:
+            # Depth-preferred within the current search; stale entries always go
+            if old[5] == self.generation and old[1] > depth:
+                return
+            self.replacements += 1
+        self.slots[index] = (key, depth, value, flag, best_move, self.generation)
+        self.stores += 1
+
+    def new_search(self):
+        """
+        Mark the start of a new search so older entries become replaceable.
+        """
+        self.generation += 1
+
+    def clear(self):
+        self.slots = [None] * self.size
+        self.generation = 0
+        self.probes = self.hits = self.stores = self.replacements = 0
+
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+    def stats(self):
+        """
+        Hit-rate statistics as a dict.
+        """
+        used = sum(1 for entry in self.slots if entry is not None)
+        return {
+            "size": self.size,
+            "used": used,
+            "generation": self.generation,
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_rate": self.hit_rate(),
+            "stores": self.stores,
+            "replacements": self.replacements,
+        }
+
+
+#=====================================================
+# Shared-memory transposition table (multi-process)
+#======================================================
+SLOT_BYTES = 16
+_SLOT = struct.Struct("<QQ")
+# Current generation, shared by all processes, stored after the slots
+_GENERATION = struct.Struct("<Q")
+# Generations are kept in the top 7 bits of a slot's data, so they wrap
+_GENERATION_MASK = 0x7F
+_VALUE = struct.Struct("<f")
+_MASK64 = (1 << 64) - 1
+_GRID = 9
+_ANCHORS = _GRID - 1
+
+
+def encode_move(move):
+    """
+    Pack a minimax move into one byte: 0 = none, 1..81 = pawn target square,
+    128..255 = wall (anchor * 2 + vertical).
+    """
+    if move is None:
+        return 0
+    if move[0] == 'move':
+        r, c = move[1]
+        return 1 + r * _GRID + c
+    _, x, y, orientation = move
+    return 128 + ((x * _ANCHORS + y) << 1) + (orientation == "V")
+
+
+def decode_move(code):
+    if code == 0:
+        return None
+    if code < 128:
+        return ('move', divmod(code - 1, _GRID))
+    anchor, vertical = divmod(code - 128, 2)
+    x, y = divmod(anchor, _ANCHORS)
+    return ('wall', x, y, "V" if vertical else "H")
+
+
+class SharedTranspositionTable:
+    """
+    Transposition table in a multiprocessing.shared_memory block, readable and
+    writable by several processes at once without locks.
+
+    Each 16-byte slot stores (key ^ data, data), where data packs the value
+    (float32), depth, bound flag, best move and generation. A reader only
+    accepts a slot whose two words XOR back to its key, so torn concurrent
+    writes are seen as misses instead of wrong entries. Same interface and
+    replacement scheme as TranspositionTable (entries of an older
+    generation always go); the generation lives in the shared block, so
+    new_search() in one process ages the table for all of them.
+    Statistics are counted per process.
+
+    Pickling the table (e.g. passing it to a ProcessPoolExecutor task)
+    attaches the receiving process to the same memory block.
+    """
+
+    def __init__(self, size_mb=16, name=None, size=None):
+        if name is None:
+            self.size = max(1, int(size_mb * 1024 * 1024) // SLOT_BYTES)
+            block = self.size * SLOT_BYTES + _GENERATION.size
+            self.shm = shared_memory.SharedMemory(create=True, size=block)
+            self.shm.buf[:block] = bytes(block)
+            self.owner = True
+        else:
+            # Attach to an existing table; the block may be page-rounded,
+            # so the slot count comes from the creator
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.size = size
+            self.owner = False
+        self.name = self.shm.name
+
+        # Statistics (this process only)
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.replacements = 0
+
+    def __reduce__(self):
+        return (SharedTranspositionTable, (None, self.name, self.size))
+
+    @property
+    def generation(self):
+        return _GENERATION.unpack_from(self.shm.buf, self.size * SLOT_BYTES)[0]
+
+    def _read(self, index):
+        check, data = _SLOT.unpack_from(self.shm.buf, index * SLOT_BYTES)
+        return check ^ data, data
+
+    def probe(self, key):
+        """
+        Return the stored entry for key as
+        (key, depth, value, flag, best_move, generation), or None.
+        """
+        self.probes += 1
+        stored_key, data = self._read(key % self.size)
+        if data == 0 or stored_key != key:
+            return None
+        self.hits += 1
+        value = _VALUE.unpack((data & 0xFFFFFFFF).to_bytes(4, "little"))[0]
+        depth = (data >> 32) & 0xFF
+        flag = (data >> 40) & 0x3
+        move = decode_move((data >> 48) & 0xFF)
+        return (key, depth, value, flag, move, data >> 57)
+
+    def store(self, key, depth, value, flag, best_move):
+        index = key % self.size
+        generation = self.generation & _GENERATION_MASK
+        stored_key, old = self._read(index)
+        if old != 0 and stored_key != key:
+            # Depth-preferred within the current search; stale entries always go
+            if old >> 57 == generation and (old >> 32) & 0xFF > depth:
+                return
+            self.replacements += 1
+
+        value_bits = int.from_bytes(_VALUE.pack(value), "little")
+        # Bit 56 marks a used slot so that data is never 0
+        data = (value_bits
+                | (min(depth, 0xFF) << 32)
+                | (flag << 40)
+                | (encode_move(best_move) << 48)
+                | (1 << 56)
+                | (generation << 57))
+        _SLOT.pack_into(self.shm.buf, index * SLOT_BYTES, (key ^ data) & _MASK64, data)
+        self.stores += 1
+
+    def new_search(self):
+        """
+        Mark the start of a new search so older entries become replaceable.
+        """
+        _GENERATION.pack_into(self.shm.buf, self.size * SLOT_BYTES, self.generation + 1)
+
+    def clear(self):
+        block = self.size * SLOT_BYTES + _GENERATION.size
+        self.shm.buf[:block] = bytes(block)
+        self.probes = self.hits = self.stores = self.replacements = 0
+
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+    def stats(self):
+        """
+        Hit-rate statistics as a dict (probes/hits/stores are for this process).
+        """
+        used = 0
+        for index in range(self.size):
+            if self._read(index)[1] != 0:
+                used += 1
+        return {
+            "size": self.size,
+            "used": used,
+            "generation": self.generation,
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_rate": self.hit_rate(),
+            "stores": self.stores,
+            "replacements": self.replacements,
+        }
+
+    def close(self):
+        """
+        Detach this process; the creating process should also call unlink().
+        """
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
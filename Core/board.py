@@ -1,10 +1,53 @@
-from Core.pathfinding import find_path
+import random
+from collections import deque
+
+from Core.pathfinding import (
+    UP, DOWN, LEFT, RIGHT, blocked_directions, edge_bit, find_path, find_bridges
+)
+
+# ===== Zobrist keys =====
+# Fixed seed so keys are stable across runs and processes
+_zobrist_rng = random.Random(0x51D0B0A4D)
+ZOBRIST_PAWN = {
+    player: [_zobrist_rng.getrandbits(64) for _ in range(9 * 9)]
+    for player in ("P1", "P2")
+}
+ZOBRIST_WALL = {
+    (x, y, o): _zobrist_rng.getrandbits(64)
+    for x in range(8) for y in range(8) for o in ("H", "V")
+}
+ZOBRIST_WALLS_LEFT = {
+    player: [_zobrist_rng.getrandbits(64) for _ in range(11)]
+    for player in ("P1", "P2")
+}
+# XORed in while P2 is to move
+ZOBRIST_SIDE = _zobrist_rng.getrandbits(64)
+
+
+def _wall_edge_mask(x, y, o, grid_size=9):
+    i = x * grid_size + y
+    if o == "H":
+        # Blocks movement between rows x and x+1 along columns y and y+1
+        return 1 << edge_bit(i, i + grid_size) | 1 << edge_bit(i + 1, i + 1 + grid_size)
+    # Blocks movement between columns y and y+1 along rows x and x+1
+    return 1 << edge_bit(i, i + 1) | 1 << edge_bit(i + grid_size, i + grid_size + 1)
+
+
+# Edge mask (see Core.pathfinding.edge_bit) blocked by each wall placement
+WALL_EDGES = {wall: _wall_edge_mask(*wall) for wall in ZOBRIST_WALL}
+
 
 class Board:
     GRID_SIZE = 9
     MAX_WALLS = 10
 
-    def __init__(self, ai_opponent=False):
+    __slots__ = (
+        "ai_opponent", "pawns", "walls", "wall_mask", "blocked_edges", "blocked",
+        "walls_left", "current_player", "history", "game_log", "redo_log",
+        "_path_cache", "zobrist_key", "wall_key",
+    )
+
+    def __init__(self, ai_opponent=False, history_limit=None):
         self.ai_opponent = ai_opponent
 
         self.pawns = {
@@ -12,11 +55,19 @@ class Board:
             "P2": (8, 4)
         }
 
-        # Walls stored as tuples: (x, y, orientation) with orientation "H" or "V"
+        # Walls stored as tuples: (x, y, orientation) with orientation "H" or "V",
+        # in the order they were placed
         self.walls = []
 
-        # Blocked edges stored as frozensets of two positions ((r1, c1), (r2, c2))
-        self.blocked_edges = set()
+        # The same walls as a bitmask indexed by wall_bit()
+        self.wall_mask = 0
+
+        # Blocked edges as a bitmask indexed by Core.pathfinding.edge_bit()
+        self.blocked_edges = 0
+
+        # The same edges per cell (index r * GRID_SIZE + c): the UP | DOWN |
+        # LEFT | RIGHT steps walls block out of it, read by the pathfinders
+        self.blocked = [0] * (self.GRID_SIZE * self.GRID_SIZE)
 
         self.walls_left = {
             "P1": self.MAX_WALLS,
@@ -25,6 +76,77 @@ class Board:
 
         self.current_player = "P1"
 
+        # Undo records pushed by apply(), popped by undo()
+        self.history = []
+
+        # Game log, separate from the search's history stack: undo records of
+        # the actions play() kept (at most history_limit, None = unlimited)
+        # and the actions taken back by undo_move()
+        self.game_log = deque(maxlen=history_limit)
+        self.redo_log = []
+
+        # One known path per player: (start, path, edge mask of the path).
+        # Stays valid until the pawn leaves it or a wall cuts one of its edges.
+        self._path_cache = {"P1": None, "P2": None}
+
+        # 64-bit position key, updated incrementally by every state change
+        self.zobrist_key = self.compute_zobrist()
+
+        # Key of the wall set alone (pawns and turn ignored), for caches of
+        # data that depends only on the walls such as distance fields
+        self.wall_key = self.compute_wall_key()
+
+    def compute_wall_key(self):
+        """
+        Key of the wall set from scratch (see wall_key).
+        """
+        key = 0
+        for wall in self.walls:
+            key ^= ZOBRIST_WALL[wall[:3]]
+        return key
+
+    def compute_zobrist(self):
+        """
+        Zobrist key of the position from scratch (pawns, walls, walls_left, side to move).
+        """
+        key = 0
+        for player, (r, c) in self.pawns.items():
+            key ^= ZOBRIST_PAWN[player][r * self.GRID_SIZE + c]
+        for wall in self.walls:
+            key ^= ZOBRIST_WALL[wall[:3]]
+        for player, left in self.walls_left.items():
+            key ^= ZOBRIST_WALLS_LEFT[player][left]
+        if self.current_player == "P2":
+            key ^= ZOBRIST_SIDE
+        return key
+
+    def rehash(self):
+        """
+        Recompute the keys and wall masks after pawns/walls/walls_left were
+        assigned directly.
+        """
+        self.wall_mask = 0
+        self.blocked_edges = 0
+        for wall in self.walls:
+            self.wall_mask |= 1 << self.wall_bit(*wall)
+            self.blocked_edges |= WALL_EDGES[wall]
+        self.blocked = blocked_directions(self.blocked_edges, self.GRID_SIZE)
+        self._path_cache = {"P1": None, "P2": None}
+        self.zobrist_key = self.compute_zobrist()
+        self.wall_key = self.compute_wall_key()
+
+    def _set_pawn(self, player, new_pos):
+        old_r, old_c = self.pawns[player]
+        new_r, new_c = new_pos
+        keys = ZOBRIST_PAWN[player]
+        self.zobrist_key ^= keys[old_r * self.GRID_SIZE + old_c] ^ keys[new_r * self.GRID_SIZE + new_c]
+        self.pawns[player] = new_pos
+
+    def _set_walls_left(self, player, left):
+        keys = ZOBRIST_WALLS_LEFT[player]
+        self.zobrist_key ^= keys[self.walls_left[player]] ^ keys[left]
+        self.walls_left[player] = left
+
     def inside_board(self, pos):
         r, c = pos
         return 0 <= r < self.GRID_SIZE and 0 <= c < self.GRID_SIZE
@@ -33,8 +155,8 @@ class Board:
         return abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1
 
     def edge_between(self, a, b):
-        # Normalize unordered edge key
-        return frozenset((a, b))
+        # Edge mask bit of the edge between neighbouring positions a and b
+        return 1 << edge_bit(a[0] * self.GRID_SIZE + a[1], b[0] * self.GRID_SIZE + b[1])
 
     def get_adjacent_positions(self, pos):
         r, c = pos
@@ -46,27 +168,34 @@ class Board:
         }
 
     def _wall_edges_for(self, x, y, o):
-        # Return the two blocked edges created by a wall
-        if o == "H":
-            # Blocks movement between rows x and x+1 along columns y and y+1
-            a1, b1 = (x, y), (x + 1, y)
-            a2, b2 = (x, y + 1), (x + 1, y + 1)
-        else:  # "V"
-            # Blocks movement between columns y and y+1 along rows x and x+1
-            a1, b1 = (x, y), (x, y + 1)
-            a2, b2 = (x + 1, y), (x + 1, y + 1)
-
-        # Only include edges that are within board bounds
-        edges = set()
-        if self.inside_board(a1) and self.inside_board(b1):
-            edges.add(self.edge_between(a1, b1))
-        if self.inside_board(a2) and self.inside_board(b2):
-            edges.add(self.edge_between(a2, b2))
-        return edges
+        # Edge mask of the two edges a wall blocks (0 for anchors off the board)
+        return WALL_EDGES.get((x, y, o), 0)
+
+    def _toggle_edges(self, edges):
+        # Block edges that are open, or reopen edges a wall blocked, in both
+        # blocked_edges and the per-cell directions
+        self.blocked_edges ^= edges
+        blocked = self.blocked
+        while edges:
+            low = edges & -edges
+            bit = low.bit_length() - 1
+            i = bit >> 1
+            if bit & 1:
+                blocked[i] ^= RIGHT
+                blocked[i + 1] ^= LEFT
+            else:
+                blocked[i] ^= DOWN
+                blocked[i + self.GRID_SIZE] ^= UP
+            edges ^= low
 
     def is_wall_blocking(self, pos, new_pos):
-        # Check if the edge between pos and new_pos is blocked
-        return self.edge_between(pos, new_pos) in self.blocked_edges
+        # Check if the step between neighbouring positions pos and new_pos is blocked
+        r, c = pos
+        if new_pos[0] != r:
+            direction = DOWN if new_pos[0] > r else UP
+        else:
+            direction = RIGHT if new_pos[1] > c else LEFT
+        return self.blocked[r * self.GRID_SIZE + c] & direction != 0
 
     def is_jump_move(self, current, opponent, new_pos):
         if not self.is_adjacent(current, opponent):
@@ -159,84 +288,363 @@ class Board:
 
         return False
 
+    def legal_pawn_moves(self, player):
+        """
+        Set of squares the player's pawn can move to, jumps included.
+        """
+        r, c = self.pawns[player]
+        targets = set()
+        # Steps and jumps never go further than two squares
+        for dr in range(-2, 3):
+            for dc in range(-2 + abs(dr), 3 - abs(dr)):
+                new_pos = (r + dr, c + dc)
+                if self.is_valid_move(player, new_pos):
+                    targets.add(new_pos)
+        return targets
+
     def move_pawn(self, player, new_pos):
         if self.is_valid_move(player, new_pos):
-            self.pawns[player] = new_pos
+            self._set_pawn(player, new_pos)
             self._switch_turn()
             return True
         return False
 
+    def _has_wall(self, x, y, orientation):
+        if not (0 <= x < self.GRID_SIZE - 1 and 0 <= y < self.GRID_SIZE - 1):
+            return False
+        return self.wall_mask >> self.wall_bit(x, y, orientation) & 1 == 1
+
     def _crosses_existing_wall(self, x, y, orientation):
         # Prevent crossing at the midpoint
         if orientation == "H":
             # Horizontal at (x, y) crosses vertical at (x, y) or (x, y+1)
-            return (x, y, "V") in self.walls or (x, y + 1, "V") in self.walls
+            return self._has_wall(x, y, "V") or self._has_wall(x, y + 1, "V")
         else:  # "V"
             # Vertical at (x, y) crosses horizontal at (x, y) or (x + 1, y)
-            return (x, y, "H") in self.walls or (x + 1, y, "H") in self.walls
+            return self._has_wall(x, y, "H") or self._has_wall(x + 1, y, "H")
 
-    def can_place_wall(self, x, y, orientation):
+    def _wall_fits(self, x, y, orientation):
+        """
+        Geometric checks only (bounds, duplicates, crossing, overlap).
+        Returns the edges the wall would block, or None if it does not fit.
+        """
         if orientation not in ("H", "V"):
-            return False
+            return None
 
         # Walls are placed between squares; top-left anchor must be within 0..GRID-2
         if x < 0 or x >= self.GRID_SIZE - 1 or y < 0 or y >= self.GRID_SIZE - 1:
-            return False
+            return None
 
         # Exact duplicate
-        if (x, y, orientation) in self.walls:
-            return False
+        if self._has_wall(x, y, orientation):
+            return None
 
         # Prevent crossing with existing walls
         if self._crosses_existing_wall(x, y, orientation):
-            return False
+            return None
 
         # Tentatively add edges and ensure no overlap at the same segment
         new_edges = self._wall_edges_for(x, y, orientation)
-        if any(e in self.blocked_edges for e in new_edges):
+        if new_edges & self.blocked_edges:
             # This catches same-segment overlap more robustly
+            return None
+
+        return new_edges
+
+    def can_place_wall(self, x, y, orientation):
+        new_edges = self._wall_fits(x, y, orientation)
+        if new_edges is None:
             return False
 
-        # Ensure walls do not completely block paths for either player
-        # Simulate placement and run pathfinding
-        start_p1 = self.pawns["P1"]
-        start_p2 = self.pawns["P2"]
-        goals_p1 = [(self.GRID_SIZE - 1, c) for c in range(self.GRID_SIZE)]
-        goals_p2 = [(0, c) for c in range(self.GRID_SIZE)]
+        # Ensure walls do not completely block paths for either player.
+        # A wall that misses a player's known path cannot disconnect them,
+        # so only search again when the cached path is actually cut.
+        for player in ("P1", "P2"):
+            path_edges = self._known_path_edges(player)
+            if path_edges is not None and not path_edges & new_edges:
+                continue
+            if not self._has_path_with(player, new_edges):
+                return False
+
+        return True
+
+    @staticmethod
+    def wall_bit(x, y, orientation):
+        """
+        Bit index of a wall placement in legal_wall_mask().
+        """
+        return ((x * (Board.GRID_SIZE - 1) + y) << 1) | (orientation == "V")
 
-        # Temporarily modify blocked_edges
-        prev_edges = set(self.blocked_edges)
-        for e in new_edges:
-            self.blocked_edges.add(e)
+    def legal_wall_mask(self):
+        """
+        Legality of every wall placement in one pass, as a bitmask indexed by
+        wall_bit(). Walls missing both players' known paths are legal outright;
+        walls covering a bridge of either path are illegal outright; only the
+        remaining walls that cut a path need a search.
+        """
+        path_edges = {}
+        critical = 0
+        for player in ("P1", "P2"):
+            edges = self._known_path_edges(player)
+            path_edges[player] = edges
+            if edges:
+                bridges = find_bridges(self.pawns[player], self._goal_row(player), self.blocked, self.GRID_SIZE)
+                critical |= bridges & edges
+
+        mask = 0
+        for x in range(self.GRID_SIZE - 1):
+            for y in range(self.GRID_SIZE - 1):
+                for orientation in ("H", "V"):
+                    new_edges = self._wall_fits(x, y, orientation)
+                    if new_edges is None or critical & new_edges:
+                        continue
+                    legal = True
+                    for player in ("P1", "P2"):
+                        edges = path_edges[player]
+                        if edges is not None and not edges & new_edges:
+                            continue
+                        if not self._has_path_with(player, new_edges):
+                            legal = False
+                            break
+                    if legal:
+                        mask |= 1 << self.wall_bit(x, y, orientation)
+        return mask
+
+    def legal_walls(self):
+        """
+        Sorted list of legal wall placements (x, y, orientation).
+        """
+        mask = self.legal_wall_mask()
+        walls = []
+        while mask:
+            low = mask & -mask
+            bit = low.bit_length() - 1
+            anchor, vertical = divmod(bit, 2)
+            x, y = divmod(anchor, self.GRID_SIZE - 1)
+            walls.append((x, y, "V" if vertical else "H"))
+            mask ^= low
+        return walls
+
+    def _goal_row(self, player):
+        return self.GRID_SIZE - 1 if player == "P1" else 0
+
+    def _cache_path(self, player, path):
+        if path is None:
+            self._path_cache[player] = None
+            return None
+        edges = 0
+        for a, b in zip(path, path[1:]):
+            edges |= self.edge_between(a, b)
+        self._path_cache[player] = (path[0], path, edges)
+        return edges
 
+    def _known_path_edges(self, player):
+        """
+        Edges of a known path from the player's pawn to its goal row,
+        reusing the cached path (or its remaining suffix) when possible.
+        """
+        start = self.pawns[player]
+        cached = self._path_cache[player]
+        if cached is not None:
+            if cached[0] == start:
+                return cached[2]
+            path = cached[1]
+            if start in path:
+                return self._cache_path(player, path[path.index(start):])
+
+        path = find_path(start, self._goal_row(player), self.blocked, self.GRID_SIZE)
+        return self._cache_path(player, path)
+
+    def _has_path_with(self, player, new_edges):
+        # Search with the extra edges blocked; a path found here is valid
+        # without them too, so it replaces the cached one
+        self._toggle_edges(new_edges)
         try:
-            p1_has_path = find_path(start_p1, goals_p1, self.blocked_edges, self.GRID_SIZE) is not None
-            p2_has_path = find_path(start_p2, goals_p2, self.blocked_edges, self.GRID_SIZE) is not None
+            path = find_path(self.pawns[player], self._goal_row(player),
+                             self.blocked, self.GRID_SIZE)
         finally:
             # Revert
-            self.blocked_edges = prev_edges
+            self._toggle_edges(new_edges)
 
-        return p1_has_path and p2_has_path
+        if path is None:
+            return False
+        self._cache_path(player, path)
+        return True
+
+    def _invalidate_paths(self, new_edges):
+        # Drop cached paths that cross newly blocked edges
+        for player, cached in self._path_cache.items():
+            if cached is not None and cached[2] & new_edges:
+                self._path_cache[player] = None
+
+    def _add_wall(self, wall, new_edges):
+        self.walls.append(wall)
+        self.wall_mask |= 1 << self.wall_bit(*wall)
+        self._toggle_edges(new_edges)
+        self._invalidate_paths(new_edges)
+        self.zobrist_key ^= ZOBRIST_WALL[wall]
+        self.wall_key ^= ZOBRIST_WALL[wall]
+
+    def _remove_wall(self, wall, new_edges):
+        # Search unwinds in LIFO order, so the wall is normally the last one
+        if self.walls[-1] == wall:
+            self.walls.pop()
+        else:
+            self.walls.remove(wall)
+        self.wall_mask ^= 1 << self.wall_bit(*wall)
+        self._toggle_edges(new_edges)
+        self.zobrist_key ^= ZOBRIST_WALL[wall]
+        self.wall_key ^= ZOBRIST_WALL[wall]
 
     def place_wall(self, player, x, y, orientation):
         if self.walls_left[player] <= 0:
             return False
 
         if self.can_place_wall(x, y, orientation):
-            self.walls.append((x, y, orientation))
-            for e in self._wall_edges_for(x, y, orientation):
-                self.blocked_edges.add(e)
-            self.walls_left[player] -= 1
+            self._add_wall((x, y, orientation), self._wall_edges_for(x, y, orientation))
+            self._set_walls_left(player, self.walls_left[player] - 1)
             self._switch_turn()
             return True
 
         return False
 
+    def apply(self, action, validate=True, player=None):
+        """
+        Play an action in place and record it for undo().
+        action is ('move', (r, c)) / ('wall', x, y, orientation) or the
+        equivalent AIPlayer dict. player is the mover (default: the current
+        player); afterwards the other player is to move. With validate=False
+        the action is assumed legal (e.g. it came from move generation).
+        Returns True if applied.
+        """
+        action = normalize_action(action)
+        turn = self.current_player
+        if player is None:
+            player = turn
+
+        if action[0] == "move":
+            new_pos = action[1]
+            if validate and not self.is_valid_move(player, new_pos):
+                return False
+            self.history.append((action, player, self.pawns[player], turn))
+            self._set_pawn(player, new_pos)
+        else:
+            _, x, y, orientation = action
+            if self.walls_left[player] <= 0:
+                return False
+            if validate and not self.can_place_wall(x, y, orientation):
+                return False
+            new_edges = self._wall_edges_for(x, y, orientation)
+            self.history.append((action, player, new_edges, turn))
+            self._add_wall((x, y, orientation), new_edges)
+            self._set_walls_left(player, self.walls_left[player] - 1)
+
+        if self.current_player == player:
+            self._switch_turn()
+        return True
+
+    def last_wall_change(self):
+        """
+        (wall_key before the last recorded action, edges it blocked) if that
+        action placed a wall, else None.
+        """
+        if not self.history:
+            return None
+        action, _, saved, _ = self.history[-1]
+        if action[0] != "wall" or not self._has_wall(*action[1:]):
+            return None
+        return self.wall_key ^ ZOBRIST_WALL[action[1:]], saved
+
+    def undo(self):
+        """
+        Revert the last action recorded by apply().
+        Returns the action that was undone, or None if there is nothing to undo.
+        """
+        if not self.history:
+            return None
+
+        action, player, saved, turn = self.history.pop()
+        if action[0] == "move":
+            self._set_pawn(player, saved)
+        else:
+            self._remove_wall(action[1:], saved)
+            self._set_walls_left(player, self.walls_left[player] + 1)
+
+        if self.current_player != turn:
+            self._switch_turn()
+        return action
+
+    # ===== Game history (undo / redo) =====
+    def play(self, action):
+        """
+        Validate and play an action as a game move: its undo record moves to
+        the game log (the oldest record drops out past history_limit) and the
+        redo log is cleared. Returns True if the action was legal.
+        """
+        if not self.apply(action):
+            return False
+        self.game_log.append(self.history.pop())
+        self.redo_log.clear()
+        return True
+
+    def undo_move(self):
+        """
+        Take back the last action played; it can be replayed with redo_move().
+        Returns the action, or None if there is nothing to undo.
+        """
+        if not self.game_log:
+            return None
+        self.history.append(self.game_log.pop())
+        action = self.undo()
+        self.redo_log.append(action)
+        return action
+
+    def redo_move(self):
+        """
+        Replay the last action taken back by undo_move().
+        Returns the action, or None if there is nothing to redo.
+        """
+        if not self.redo_log:
+            return None
+        action = self.redo_log.pop()
+        self.apply(action, validate=False)
+        self.game_log.append(self.history.pop())
+        return action
+
     def copy(self):
         """
-        Return a deep copy of the board.
+        Return an independent copy of the board. Records, paths and masks
+        are immutable, so only the containers are copied.
         """
-        import copy
-        return copy.deepcopy(self)
+        board = Board.__new__(Board)
+        board.ai_opponent = self.ai_opponent
+        board.pawns = dict(self.pawns)
+        board.walls = list(self.walls)
+        board.wall_mask = self.wall_mask
+        board.blocked_edges = self.blocked_edges
+        board.blocked = list(self.blocked)
+        board.walls_left = dict(self.walls_left)
+        board.current_player = self.current_player
+        board.history = list(self.history)
+        board.game_log = deque(self.game_log, maxlen=self.game_log.maxlen)
+        board.redo_log = list(self.redo_log)
+        board._path_cache = dict(self._path_cache)
+        board.zobrist_key = self.zobrist_key
+        board.wall_key = self.wall_key
+        return board
+
     def _switch_turn(self):
-        self.current_player = "P2" if self.current_player == "P1" else "P1"
\ No newline at end of file
+        self.current_player = "P2" if self.current_player == "P1" else "P1"
+        self.zobrist_key ^= ZOBRIST_SIDE
+
+
+def normalize_action(action):
+    """
+    Convert an AIPlayer action dict to the tuple form used by minimax:
+    ('move', (r, c)) or ('wall', x, y, orientation).
+    """
+    if isinstance(action, dict):
+        if action["type"] == "move":
+            return ("move", tuple(action["to"]))
+        return ("wall", action["x"], action["y"], action["orientation"])
+    return action
\ No newline at end of file
@@ -1,50 +1,515 @@
-from collections import deque
+import threading
+from collections import OrderedDict
 
-def find_path(start_pos, goal_positions, blocked_edges, grid_size):
+# Blocked directions per cell, see blocked_directions()
+UP, DOWN, LEFT, RIGHT = 1, 2, 4, 8
+
+
+def edge_bit(i, j):
+    """
+    Bit index of the edge between neighbouring cells i and j (flat indices
+    r * grid_size + c) in an edge mask: 2 * i for the step down from cell i,
+    2 * i + 1 for the step right.
+    """
+    if i > j:
+        i, j = j, i
+    return 2 * i + (j - i == 1)
+
+
+def blocked_directions(blocked_edges, grid_size):
     """
-    BFS to find a path from start_pos to any of goal_positions.
-    Returns a path (list of positions) or None if no path exists.
+    Flat list (index = r * grid_size + c) of the directions walls block
+    out of each cell, as UP | DOWN | LEFT | RIGHT bits, from an edge mask
+    (see edge_bit).
     """
-    queue = deque([(start_pos, [start_pos])])
-    visited = set([start_pos])
+    blocked = [0] * (grid_size * grid_size)
+    while blocked_edges:
+        low = blocked_edges & -blocked_edges
+        bit = low.bit_length() - 1
+        i = bit >> 1
+        if bit & 1:
+            blocked[i] |= RIGHT
+            blocked[i + 1] |= LEFT
+        else:
+            blocked[i] |= DOWN
+            blocked[i + grid_size] |= UP
+        blocked_edges ^= low
+    return blocked
+
 
-    while queue:
-        pos, path = queue.popleft()
-        if pos in goal_positions:
-            return path
+def find_path(start_pos, goal, blocked, grid_size, result="path"):
+    """
+    BFS from start_pos to the goal: a row index, or a collection of positions.
+    blocked is the per-cell list of blocked directions (see
+    blocked_directions, Board.blocked). Cells are visited once and remember
+    their parent; the path is only built when the goal is found.
+
+    result selects what is returned:
+      "path"      - list of positions from start_pos to the goal, or None
+      "reachable" - True / False
+      "distance"  - number of steps, or float('inf') if unreachable
+    """
+    if isinstance(goal, int):
+        goals = range(goal * grid_size, (goal + 1) * grid_size)
+    else:
+        goals = {r * grid_size + c for r, c in goal}
 
-        r, c = pos
-        # 4 orthogonal moves
-        neighbors = [(r-1, c), (r+1, c), (r, c-1), (r, c+1)]
-        for n in neighbors:
-            if 0 <= n[0] < grid_size and 0 <= n[1] < grid_size:
-                if frozenset((pos, n)) not in blocked_edges and n not in visited:
-                    visited.add(n)
-                    queue.append((n, path + [n]))
+    n = grid_size * grid_size
+    start = start_pos[0] * grid_size + start_pos[1]
+    parent = [-1] * n
+    parent[start] = start
 
+    # Layer by layer, so the distance is the layer count
+    frontier = [start]
+    distance = 0
+    while frontier:
+        next_frontier = []
+        for i in frontier:
+            if i in goals:
+                if result == "reachable":
+                    return True
+                if result == "distance":
+                    return distance
+                path = [i]
+                while i != start:
+                    i = parent[i]
+                    path.append(i)
+                path.reverse()
+                return [divmod(i, grid_size) for i in path]
+
+            walls = blocked[i]
+            # 4 orthogonal moves: up, down, left, right
+            if i >= grid_size and not walls & UP and parent[i - grid_size] < 0:
+                parent[i - grid_size] = i
+                next_frontier.append(i - grid_size)
+            if i + grid_size < n and not walls & DOWN and parent[i + grid_size] < 0:
+                parent[i + grid_size] = i
+                next_frontier.append(i + grid_size)
+            col = i % grid_size
+            if col > 0 and not walls & LEFT and parent[i - 1] < 0:
+                parent[i - 1] = i
+                next_frontier.append(i - 1)
+            if col < grid_size - 1 and not walls & RIGHT and parent[i + 1] < 0:
+                parent[i + 1] = i
+                next_frontier.append(i + 1)
+        frontier = next_frontier
+        distance += 1
+
+    if result == "reachable":
+        return False
+    if result == "distance":
+        return float('inf')
     return None
 
+def goal_distance_field(goal_row, blocked, grid_size):
+    """
+    Multi-source BFS from every cell of goal_row at once, with blocked the
+    per-cell list of blocked directions.
+    Returns a flat list (index = r * grid_size + c) with each cell's number of
+    steps to the goal row, float('inf') where the goal row cannot be reached.
+    """
+    n = grid_size * grid_size
+    field = [float('inf')] * n
+    frontier = list(range(goal_row * grid_size, (goal_row + 1) * grid_size))
+    for i in frontier:
+        field[i] = 0
+
+    distance = 0
+    while frontier:
+        distance += 1
+        next_frontier = []
+        for i in frontier:
+            walls = blocked[i]
+            if i >= grid_size and not walls & UP and field[i - grid_size] > distance:
+                field[i - grid_size] = distance
+                next_frontier.append(i - grid_size)
+            if i + grid_size < n and not walls & DOWN and field[i + grid_size] > distance:
+                field[i + grid_size] = distance
+                next_frontier.append(i + grid_size)
+            col = i % grid_size
+            if col > 0 and not walls & LEFT and field[i - 1] > distance:
+                field[i - 1] = distance
+                next_frontier.append(i - 1)
+            if col < grid_size - 1 and not walls & RIGHT and field[i + 1] > distance:
+                field[i + 1] = distance
+                next_frontier.append(i + 1)
+        frontier = next_frontier
+    return field
+
+
+# Per grid size: for every cell index, the (direction bit, neighbour index) steps inside the board
+_STEP_TABLES = {}
+
+
+def step_table(grid_size):
+    table = _STEP_TABLES.get(grid_size)
+    if table is None:
+        table = []
+        for i in range(grid_size * grid_size):
+            r, c = divmod(i, grid_size)
+            steps = []
+            if r > 0:
+                steps.append((UP, i - grid_size))
+            if r < grid_size - 1:
+                steps.append((DOWN, i + grid_size))
+            if c > 0:
+                steps.append((LEFT, i - 1))
+            if c < grid_size - 1:
+                steps.append((RIGHT, i + 1))
+            table.append(steps)
+        _STEP_TABLES[grid_size] = table
+    return table
+
+
+def repair_distance_field(field, new_edges, goal_row, blocked, grid_size):
+    """
+    Update a goal distance field in place after a wall blocked the edge mask
+    new_edges (blocked, the per-cell blocked directions, must already include
+    them). Only cells that lose every shortest step towards the goal, and the
+    cells that depended on them, are recomputed; everything else is left
+    untouched.
+
+    Returns the list of (index, old_distance) changes. Undo needs no
+    reverse pass: DistanceFieldCache repairs a copy and still holds the
+    field of the wall set before.
+    """
+    inf = float('inf')
+
+    # 1. Find the cells whose distance must grow. A blocked edge only matters
+    #    to the endpoint that stepped through it towards the goal; a cell is
+    #    invalid once no open neighbour one step closer to the goal is left.
+    #    Cells are settled nearest first (buckets by distance), so their
+    #    supports are settled already.
+    buckets = {}
+    while new_edges:
+        low = new_edges & -new_edges
+        bit = low.bit_length() - 1
+        new_edges ^= low
+        a = bit >> 1
+        b = a + 1 if bit & 1 else a + grid_size
+        if field[b] != inf and field[a] == field[b] + 1:
+            buckets.setdefault(field[a], []).append(a)
+        elif field[a] != inf and field[b] == field[a] + 1:
+            buckets.setdefault(field[b], []).append(b)
+    if not buckets:
+        return []
+
+    steps = step_table(grid_size)
+    goal_start = goal_row * grid_size
+    goal_end = goal_start + grid_size
+    invalid = set()
+    distance = min(buckets)
+    while buckets:
+        for i in buckets.pop(distance, ()):
+            if i in invalid or goal_start <= i < goal_end:
+                continue
+            walls = blocked[i]
+            supported = False
+            for bit, j in steps[i]:
+                if not walls & bit and field[j] == distance - 1 and j not in invalid:
+                    supported = True
+                    break
+            if supported:
+                continue
+            invalid.add(i)
+            # Cells that may have stepped through i (across a newly blocked
+            # edge they were queued above already)
+            for bit, j in steps[i]:
+                if not walls & bit and field[j] == distance + 1:
+                    buckets.setdefault(distance + 1, []).append(j)
+        distance += 1
+
+    if not invalid:
+        return []
+
+    # 2. Recompute the invalid cells outwards from their valid surroundings
+    changes = [(i, field[i]) for i in invalid]
+    for i in invalid:
+        field[i] = inf
+    for i in invalid:
+        walls = blocked[i]
+        best = inf
+        for bit, j in steps[i]:
+            if not walls & bit and field[j] + 1 < best:
+                best = field[j] + 1
+        if best != inf:
+            buckets.setdefault(best, []).append(i)
+
+    distance = min(buckets) if buckets else 0
+    while buckets:
+        for i in buckets.pop(distance, ()):
+            if field[i] <= distance:
+                continue
+            field[i] = distance
+            walls = blocked[i]
+            for bit, j in steps[i]:
+                if not walls & bit and field[j] > distance + 1:
+                    buckets.setdefault(distance + 1, []).append(j)
+        distance += 1
+    return changes
+
+
+class DistanceFieldCache:
+    """
+    LRU cache of goal distance fields keyed by (Board.wall_key, player).
+    A field depends only on the walls, so positions that differ only by pawn
+    moves share one entry. On a miss right after a wall was placed, the
+    field of the wall set before it is copied and repaired when still cached
+    (see repair_distance_field) instead of recomputed from scratch.
+    Cached fields are shared: callers must not modify them.
+    """
+
+    def __init__(self, size=16384):
+        self.size = size
+        self.fields = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.repairs = 0  # misses served by repairing the parent field
+
+    def get(self, board, player):
+        key = (board.wall_key, player)
+        with self.lock:
+            field = self.fields.get(key)
+            if field is not None:
+                self.fields.move_to_end(key)
+                self.hits += 1
+                return field
+            self.misses += 1
+            parent = None
+            change = board.last_wall_change()
+            if change is not None:
+                parent = self.fields.get((change[0], player))
+
+        goal_row = board.GRID_SIZE - 1 if player == "P1" else 0
+        if parent is not None:
+            field = list(parent)
+            repair_distance_field(field, change[1], goal_row, board.blocked, board.GRID_SIZE)
+            self.repairs += 1
+        else:
+            field = goal_distance_field(goal_row, board.blocked, board.GRID_SIZE)
+        with self.lock:
+            self.fields[key] = field
+            while len(self.fields) > self.size:
+                self.fields.popitem(last=False)
+        return field
+
+    def resize(self, size):
+        """
+        Change the number of fields kept, dropping the least recently used ones.
+        """
+        with self.lock:
+            self.size = size
+            while len(self.fields) > self.size:
+                self.fields.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.fields.clear()
+            self.hits = self.misses = self.repairs = 0
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            "size": self.size,
+            "used": len(self.fields),
+            "hits": self.hits,
+            "misses": self.misses,
+            "repairs": self.repairs,
+            "hit_rate": self.hit_rate(),
+        }
+
+
+# Shared by every distance_field() call; resize() it to trade memory for hits
+DISTANCE_CACHE = DistanceFieldCache()
+
+
+def distance_field(board, player):
+    """
+    Distance to the player's goal row from every cell (pawns ignored), as a
+    flat list indexed by r * GRID_SIZE + c. Gives the pawn's distance, the
+    distance after any step, and the shortest-path DAG: an open step from
+    cell a to cell b lies on a shortest path iff field[b] == field[a] - 1.
+    Boards with a wall_key are served from DISTANCE_CACHE; the returned
+    list is shared and must not be modified.
+    """
+    if getattr(board, "wall_key", None) is not None:
+        return DISTANCE_CACHE.get(board, player)
+    goal_row = board.GRID_SIZE - 1 if player == "P1" else 0
+    return goal_distance_field(goal_row, board.blocked, board.GRID_SIZE)
+
+
+def shortest_path_dag(board, player):
+    """
+    Every cell and edge on some shortest path from the player's pawn to its
+    goal row (pawns ignored): the part of the distance field's shortest-path
+    DAG reachable from the pawn.
+    Returns (set of cell indices, edge mask (see edge_bit)).
+    """
+    grid_size = board.GRID_SIZE
+    field = distance_field(board, player)
+    blocked = board.blocked
+    steps = step_table(grid_size)
+
+    r, c = board.pawns[player]
+    start = r * grid_size + c
+    cells = {start}
+    edges = 0
+    if field[start] == float('inf'):
+        return cells, edges
+
+    stack = [start]
+    while stack:
+        i = stack.pop()
+        closer = field[i] - 1
+        walls = blocked[i]
+        for bit, j in steps[i]:
+            if not walls & bit and field[j] == closer:
+                edges |= 1 << edge_bit(i, j)
+                if j not in cells:
+                    cells.add(j)
+                    stack.append(j)
+    return cells, edges
+
+
+# Directions a diagonal jump may turn to when the straight jump is blocked
+SIDEWAYS = {UP: (LEFT, RIGHT), DOWN: (LEFT, RIGHT), LEFT: (UP, DOWN), RIGHT: (UP, DOWN)}
+
+# Per grid size: for every cell index, {direction bit: neighbour index} inside the board
+_DIRECTION_TABLES = {}
+
+
+def direction_table(grid_size):
+    table = _DIRECTION_TABLES.get(grid_size)
+    if table is None:
+        table = [dict(steps) for steps in step_table(grid_size)]
+        _DIRECTION_TABLES[grid_size] = table
+    return table
+
+
+def jump_distance(board, player):
+    """
+    Number of pawn moves the player needs to reach the goal row if the
+    opponent's pawn stays where it is, with the real move rules: the pawn
+    cannot stop on the opponent, jumps straight over it, or diagonally
+    around it when a wall or the board edge is behind it.
+    Uses precomputed neighbour tables instead of Board.is_valid_move.
+    Returns float('inf') if the goal row cannot be reached.
+    """
+    grid_size = board.GRID_SIZE
+    opponent = "P2" if player == "P1" else "P1"
+    goal_row = grid_size - 1 if player == "P1" else 0
+    goal_start = goal_row * grid_size
+    goal_end = goal_start + grid_size
+
+    blocked = board.blocked
+    steps = step_table(grid_size)
+    directions = direction_table(grid_size)
+
+    r, c = board.pawns[player]
+    start = r * grid_size + c
+    r, c = board.pawns[opponent]
+    opp = r * grid_size + c
+
+    seen = [False] * (grid_size * grid_size)
+    seen[start] = True
+    frontier = [start]
+    distance = 0
+    while frontier:
+        next_frontier = []
+        for i in frontier:
+            if goal_start <= i < goal_end:
+                return distance
+            walls = blocked[i]
+            for bit, j in steps[i]:
+                if walls & bit:
+                    continue
+                if j != opp:
+                    targets = (j,)
+                else:
+                    # Jump over the opponent: straight if possible, else sideways
+                    behind = directions[j].get(bit)
+                    if behind is not None and not blocked[j] & bit:
+                        targets = (behind,)
+                    else:
+                        targets = [directions[j][side] for side in SIDEWAYS[bit]
+                                   if side in directions[j] and not blocked[j] & side]
+                for k in targets:
+                    if not seen[k]:
+                        seen[k] = True
+                        next_frontier.append(k)
+        frontier = next_frontier
+        distance += 1
+
+    return float('inf')
+
+
 def shortest_path(player, board_state):
     """
-    BFS to find the length of the shortest path from player's pawn to goal row.
+    Length of the shortest path from player's pawn to goal row, jumps
+    included (see jump_distance).
     Returns integer distance if path exists, else float('inf').
     """
-    start_pos = board_state.pawns[player]
-    goal_row = 8 if player == "P1" else 0
+    return jump_distance(board_state, player)
 
-    queue = deque([(start_pos, 0)])  # store (position, distance)
-    visited = set([start_pos])
 
-    while queue:
-        pos, dist = queue.popleft()
-        r, c = pos
+def find_bridges(start_pos, goal_row, blocked, grid_size):
+    """
+    Tarjan bridge search over the open grid reachable from start_pos, with every
+    cell of goal_row joined to one virtual goal node.
+    A bridge that lies on a path from start_pos to the goal row is crossed by
+    every such path, so blocking it disconnects the pawn from its goal.
+    Returns the bridge edges as an edge mask (see edge_bit).
+    """
+    n = grid_size * grid_size
+    goal = n  # virtual node
 
-        if r == goal_row:
-            return dist
+    adj = [[] for _ in range(n + 1)]
+    for r in range(grid_size):
+        for c in range(grid_size):
+            i = r * grid_size + c
+            if r + 1 < grid_size and not blocked[i] & DOWN:
+                adj[i].append(i + grid_size)
+                adj[i + grid_size].append(i)
+            if c + 1 < grid_size and not blocked[i] & RIGHT:
+                adj[i].append(i + 1)
+                adj[i + 1].append(i)
+            if r == goal_row:
+                adj[i].append(goal)
+                adj[goal].append(i)
 
-        for move in board_state.get_adjacent_positions(pos).values():
-            if board_state.is_valid_move(player, move) and move not in visited:
-                visited.add(move)
-                queue.append((move, dist + 1))
+    root = start_pos[0] * grid_size + start_pos[1]
+    disc = [-1] * (n + 1)
+    low = [0] * (n + 1)
+    disc[root] = low[root] = 0
+    timer = 1
+    bridges = 0
 
-    return float('inf')
+    # Iterative DFS: (node, parent, neighbour iterator)
+    stack = [(root, -1, iter(adj[root]))]
+    while stack:
+        v, parent, neighbours = stack[-1]
+        advanced = False
+        for w in neighbours:
+            if w == parent:
+                continue
+            if disc[w] == -1:
+                disc[w] = low[w] = timer
+                timer += 1
+                stack.append((w, v, iter(adj[w])))
+                advanced = True
+                break
+            low[v] = min(low[v], disc[w])
+
+        if not advanced:
+            stack.pop()
+            if stack:
+                u = stack[-1][0]
+                low[u] = min(low[u], low[v])
+                if low[v] > disc[u] and u != goal and v != goal:
+                    bridges |= 1 << edge_bit(u, v)
+
+    return bridges
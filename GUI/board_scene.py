@@ -0,0 +1,355 @@
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+from PyQt5.QtWidgets import *
+
+# ===== Board geometry (scene units) =====
+CELL_SIZE = 68
+GAP = 10
+MARGIN = 14  # Room for the shadow/glow of the outer cells
+SHADOW = 6   # Extra pixmap border used for shadows and glows
+
+PAWN_COLORS = {"P1": "#AD1457", "P2": "#F48FB1"}
+
+# (gradient start, middle, gradient end, border, glow) per player
+WALL_COLORS = {
+    "P1": ("#EC407A", "#D81B60", "#AD1457", "#880E4F", QColor(216, 27, 96, 220)),
+    "P2": ("#FFB3D9", "#FF80AB", "#F48FB1", "#F06292", QColor(255, 128, 171, 220)),
+    # Hover preview of a wall that cannot be placed
+    "illegal": ("#BDBDBD", "#9E9E9E", "#757575", "#616161", QColor(97, 97, 97, 160)),
+}
+
+# Opacity of the wall under the cursor in wall mode
+PREVIEW_OPACITY = 0.55
+
+# Pixmaps are painted once and shared by every item that shows them
+_pixmap_cache = {}
+
+
+def cachedPixmap(key, width, height, paint):
+    """
+    Return the pixmap for key, painting it with paint(painter) on first use.
+    """
+    pixmap = _pixmap_cache.get(key)
+    if pixmap is None:
+        pixmap = QPixmap(width, height)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        paint(painter)
+        painter.end()
+        _pixmap_cache[key] = pixmap
+    return pixmap
+
+
+def cellPixmap(hovered=False):
+    size = CELL_SIZE + 2 * SHADOW
+
+    def paint(painter):
+        rect = QRectF(SHADOW, SHADOW, CELL_SIZE, CELL_SIZE)
+
+        # Soft drop shadow
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(233, 30, 99, 60))
+        painter.drawRoundedRect(rect.translated(3, 3), 16, 16)
+
+        gradient = QLinearGradient(rect.topLeft(), rect.bottomLeft())
+        if hovered:
+            gradient.setColorAt(0, QColor("#FFD6E8"))
+            gradient.setColorAt(1, QColor("#FFD6E8"))
+            border = "#EC407A"
+        else:
+            gradient.setColorAt(0, QColor("#FFE4F5"))
+            gradient.setColorAt(1, QColor("#FFC1E3"))
+            border = "#F06292"
+        painter.setBrush(QBrush(gradient))
+        painter.setPen(QPen(QColor(border), 2))
+        painter.drawRoundedRect(rect.adjusted(1, 1, -1, -1), 16, 16)
+
+    return cachedPixmap(("cell", hovered), size, size, paint)
+
+
+def pawnPixmap(player):
+    size = CELL_SIZE + 2 * SHADOW
+    base_color = PAWN_COLORS[player]
+
+    def paint(painter):
+        center = QPointF(size / 2, size / 2)
+
+        # Glow
+        glow = QRadialGradient(center, size / 2)
+        glow.setColorAt(0.7, QColor(255, 192, 227, 180))
+        glow.setColorAt(1, QColor(255, 192, 227, 0))
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QBrush(glow))
+        painter.drawEllipse(center, size / 2, size / 2)
+
+        # Pawn
+        rect = QRectF(SHADOW + 2, SHADOW + 2, CELL_SIZE - 4, CELL_SIZE - 4)
+        gradient = QRadialGradient(
+            rect.left() + rect.width() * 0.3,
+            rect.top() + rect.height() * 0.3,
+            rect.width() * 0.8
+        )
+        gradient.setColorAt(0, QColor("#FFFFFF"))
+        gradient.setColorAt(0.35, QColor(base_color))
+        gradient.setColorAt(1, QColor("#880E4F"))
+        painter.setBrush(QBrush(gradient))
+        painter.setPen(QPen(QColor("#FFF0F7"), 4))
+        painter.drawEllipse(rect)
+
+    return cachedPixmap(("pawn", player), size, size, paint)
+
+
+def targetPixmap():
+    size = CELL_SIZE + 2 * SHADOW
+
+    def paint(painter):
+        # Dot in the middle of a cell the pawn can move to
+        radius = CELL_SIZE / 6
+        painter.setPen(QPen(QColor("#FFF0F7"), 3))
+        painter.setBrush(QColor(236, 64, 122, 200))
+        painter.drawEllipse(QPointF(size / 2, size / 2), radius, radius)
+
+    return cachedPixmap(("target",), size, size, paint)
+
+
+def wallSize(orientation):
+    if orientation == "H":
+        return CELL_SIZE * 2 + GAP, GAP
+    return GAP, CELL_SIZE * 2 + GAP
+
+
+def wallPixmap(orientation, player):
+    width, height = wallSize(orientation)
+    gradient_start, wall_color, gradient_end, border_color, glow_color = WALL_COLORS[player]
+
+    def paint(painter):
+        rect = QRectF(SHADOW, SHADOW, width, height)
+
+        # Glow: a few widening translucent outlines
+        painter.setBrush(Qt.NoBrush)
+        for spread in range(SHADOW, 0, -2):
+            color = QColor(glow_color)
+            color.setAlpha(glow_color.alpha() // (spread + 1))
+            painter.setPen(QPen(color, 2))
+            painter.drawRoundedRect(rect.adjusted(-spread, -spread, spread, spread), 3 + spread, 3 + spread)
+
+        if orientation == "H":
+            gradient = QLinearGradient(rect.topLeft(), rect.topRight())
+        else:
+            gradient = QLinearGradient(rect.topLeft(), rect.bottomLeft())
+        gradient.setColorAt(0, QColor(gradient_start))
+        gradient.setColorAt(0.5, QColor(wall_color))
+        gradient.setColorAt(1, QColor(gradient_end))
+        painter.setBrush(QBrush(gradient))
+        painter.setPen(QPen(QColor(border_color), 2))
+        painter.drawRoundedRect(rect.adjusted(1, 1, -1, -1), 3, 3)
+
+    return cachedPixmap(("wall", orientation, player), width + 2 * SHADOW, height + 2 * SHADOW, paint)
+
+
+def cellOrigin(row, col):
+    """
+    Scene position of the top-left corner of a cell.
+    """
+    return QPointF(MARGIN + col * (CELL_SIZE + GAP), MARGIN + row * (CELL_SIZE + GAP))
+
+
+class BoardCanvas(QGraphicsView):
+    """
+    The whole board drawn in one QGraphicsScene from cached pixmaps:
+    81 cell items, a hover highlight, two pawn items and one item per wall.
+    Emits cellClicked(row, col) when a cell is clicked and
+    cellHovered(row, col) when the mouse enters a cell, (-1, -1) when it
+    leaves the board.
+    """
+    cellClicked = pyqtSignal(int, int)
+    cellHovered = pyqtSignal(int, int)
+
+    def __init__(self, grid_size=9, parent=None):
+        super().__init__(parent)
+        self.grid_size = grid_size
+
+        side = 2 * MARGIN + grid_size * CELL_SIZE + (grid_size - 1) * GAP
+        self.board_scene = QGraphicsScene(0, 0, side, side, self)
+        self.setScene(self.board_scene)
+
+        self.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setFrameShape(QFrame.NoFrame)
+        self.setStyleSheet("background: transparent; border: none;")
+        self.setMouseTracking(True)
+        self.setMinimumSize(480, 480)
+
+        # Cells
+        for r in range(grid_size):
+            for c in range(grid_size):
+                self.addPixmapItem(cellPixmap(), cellOrigin(r, c), z=0)
+
+        # Hover highlight, moved to whichever cell is under the mouse
+        self.hover_item = self.addPixmapItem(cellPixmap(hovered=True), QPointF(0, 0), z=1)
+        self.hover_item.hide()
+
+        # Pawns
+        self.pawn_items = {
+            player: self.addPixmapItem(pawnPixmap(player), QPointF(0, 0), z=2)
+            for player in ("P1", "P2")
+        }
+
+        # Walls keyed by (x, y, orientation)
+        self.wall_items = {}
+
+        # Legal pawn targets, one hidden marker per cell
+        self.target_items = {}
+        for r in range(grid_size):
+            for c in range(grid_size):
+                item = self.addPixmapItem(targetPixmap(), cellOrigin(r, c), z=1)
+                item.hide()
+                self.target_items[(r, c)] = item
+        self.shown_targets = set()
+
+        # Wall under the cursor in wall mode
+        self.preview_item = self.addPixmapItem(wallPixmap("H", "P1"), QPointF(0, 0), z=4)
+        self.preview_item.setOpacity(PREVIEW_OPACITY)
+        self.preview_item.hide()
+        self.preview_look = ("H", "P1")
+
+        self.hovered_cell = None
+
+    def addPixmapItem(self, pixmap, origin, z):
+        item = self.board_scene.addPixmap(pixmap)
+        item.setOffset(-SHADOW, -SHADOW)
+        item.setPos(origin)
+        item.setZValue(z)
+        item.setTransformationMode(Qt.SmoothTransformation)
+        return item
+
+    # ===== Board state =====
+    def movePawn(self, player, row, col):
+        item = self.pawn_items[player]
+        origin = cellOrigin(row, col)
+        if item.pos() != origin:
+            item.setPos(origin)
+
+    def wallOrigin(self, x, y, orientation):
+        # Walls sit in the gap below (H) or right of (V) their anchor cell
+        origin = cellOrigin(x, y)
+        if orientation == "H":
+            return origin + QPointF(0, CELL_SIZE)
+        return origin + QPointF(CELL_SIZE, 0)
+
+    def addWall(self, x, y, orientation, player):
+        """
+        Show a wall anchored at cell (x, y).
+        """
+        self.wall_items[(x, y, orientation)] = self.addPixmapItem(
+            wallPixmap(orientation, player), self.wallOrigin(x, y, orientation), z=3
+        )
+
+    def removeWall(self, x, y, orientation):
+        item = self.wall_items.pop((x, y, orientation), None)
+        if item is not None:
+            self.board_scene.removeItem(item)
+
+    def clearWalls(self):
+        for item in self.wall_items.values():
+            self.board_scene.removeItem(item)
+        self.wall_items.clear()
+
+    def showTargets(self, cells):
+        """
+        Mark the given cells as legal pawn targets (only changed markers are touched).
+        """
+        cells = set(cells)
+        for cell in self.shown_targets - cells:
+            self.target_items[cell].hide()
+        for cell in cells - self.shown_targets:
+            self.target_items[cell].show()
+        self.shown_targets = cells
+
+    def showWallPreview(self, x, y, orientation, player, legal):
+        """
+        Show a translucent wall at (x, y): in the player's colors if it can be
+        placed there, greyed out otherwise.
+        """
+        look = (orientation, player if legal else "illegal")
+        if look != self.preview_look:
+            self.preview_item.setPixmap(wallPixmap(*look))
+            self.preview_look = look
+        self.preview_item.setPos(self.wallOrigin(x, y, orientation))
+        self.preview_item.show()
+
+    def hideWallPreview(self):
+        self.preview_item.hide()
+
+    def showState(self, pawns, walls, wall_owners):
+        """
+        Bring the scene to the given pawns / walls, touching only the items
+        that differ from what is shown; all changes land in one repaint.
+        """
+        target = set(walls)
+        self.setUpdatesEnabled(False)
+        try:
+            for player, (r, c) in pawns.items():
+                self.movePawn(player, r, c)
+
+            for wall in [wall for wall in self.wall_items if wall not in target]:
+                self.removeWall(*wall)
+            for wall in walls:
+                if wall not in self.wall_items:
+                    self.addWall(*wall, wall_owners.get(wall, "P1"))
+        finally:
+            self.setUpdatesEnabled(True)
+
+    # ===== Input =====
+    def cellAt(self, view_pos):
+        """
+        (row, col) of the cell under a view position, or None (gaps and margins).
+        """
+        scene_pos = self.mapToScene(view_pos)
+        step = CELL_SIZE + GAP
+        x = scene_pos.x() - MARGIN
+        y = scene_pos.y() - MARGIN
+        if x < 0 or y < 0:
+            return None
+        col, in_x = divmod(x, step)
+        row, in_y = divmod(y, step)
+        if in_x > CELL_SIZE or in_y > CELL_SIZE:
+            return None
+        row, col = int(row), int(col)
+        if row >= self.grid_size or col >= self.grid_size:
+            return None
+        return row, col
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            cell = self.cellAt(event.pos())
+            if cell is not None:
+                self.cellClicked.emit(*cell)
+        event.accept()
+
+    def setHoveredCell(self, cell):
+        if cell == self.hovered_cell:
+            return
+        self.hovered_cell = cell
+        if cell is None:
+            self.hover_item.hide()
+            self.cellHovered.emit(-1, -1)
+        else:
+            self.hover_item.setPos(cellOrigin(*cell))
+            self.hover_item.show()
+            self.cellHovered.emit(*cell)
+
+    def mouseMoveEvent(self, event):
+        self.setHoveredCell(self.cellAt(event.pos()))
+        super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        self.setHoveredCell(None)
+        super().leaveEvent(event)
+
+    def resizeEvent(self, event):
+        # Scale the board to the available space
+        self.fitInView(self.board_scene.sceneRect(), Qt.KeepAspectRatio)
+        super().resizeEvent(event)
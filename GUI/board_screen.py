@@ -5,17 +5,20 @@ from Core.board import Board
 
 import sys
 import os
-from copy import deepcopy
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from Ai.ai_player import AIPlayer
+from GUI.board_scene import BoardCanvas
+from GUI.engine_worker import PonderWorker, SearchWorker
 
 class BoardView(QWidget):
     # Signal to go back to main menu
     backToMenu = pyqtSignal()
 
     GRID_SIZE = 9
+    # Most actions kept for undo (None = the whole game)
+    HISTORY_LIMIT = 500
 
     def __init__(self, mode, difficulty="easy"):
         """
@@ -31,11 +34,9 @@ class BoardView(QWidget):
         self.setWindowTitle("Quoridor - Game Board")
         self.setGeometry(500, 100, 980, 900)
 
-        self.cells = {}
-        self.wall_labels = []
-        self.board_created = Board(self.mode == 'AI')
-        self.undo_stack = []
-        self.redo_stack = []
+        # Who placed each wall shown, keyed by (x, y, orientation)
+        self.wall_owners = {}
+        self.board_created = Board(self.mode == 'AI', self.HISTORY_LIMIT)
 
         # Make window frameless
         self.setWindowFlags(Qt.FramelessWindowHint)
@@ -45,19 +46,20 @@ class BoardView(QWidget):
         self.wall_orientation = "H"
 
 
+        # Background search while the human is thinking (AI mode)
+        self.ponder_worker = None
+        # Engine search for the AI's own move, off the GUI thread
+        self.search_worker = None
+
+        # Legal actions of the side to move, computed once per position
+        self.legal_cache = None
+
         self.initUI()
+        self.updateHighlights()
         if self.mode == "AI":
             from Ai.ai_player import AIPlayer
             self.ai_player_obj = AIPlayer("P2", self.difficulty)
-
-    def saveState(self):
-        self.undo_stack.append({
-            "pawns": deepcopy(self.board_created.pawns),
-            "walls": deepcopy(self.board_created.walls),
-            "walls_left": deepcopy(self.board_created.walls_left),
-            "current_player": self.board_created.current_player
-        })
-        self.redo_stack.clear()
+            self.startPondering()
 
     def initUI(self):
         """
@@ -110,52 +112,15 @@ class BoardView(QWidget):
         """)
         board_container.addWidget(title)
 
-        # Board Grid
-        grid_widget = QWidget()
-        grid_layout = QGridLayout()
-        grid_layout.setSpacing(10)
-
-        tile_style = """
-        QPushButton {
-            background: qlineargradient(
-                x1:0, y1:0, x2:0, y2:1,
-                stop:0 #FFE4F5,
-                stop:1 #FFC1E3
-            );
-            border: 2px solid #F06292;
-            border-radius: 16px;
-            min-width: 68px;
-            min-height: 68px;
-        }
-        QPushButton:hover {
-            background: #FFD6E8;
-            border: 2px solid #EC407A;
-        }
-        """
-
-        # Create cells (9x9)
-        for r in range(self.GRID_SIZE):
-            for c in range(self.GRID_SIZE):
-                btn = QPushButton()
-                btn.setStyleSheet(tile_style)
-                btn.setProperty("row", r)
-                btn.setProperty("col", c)
-                btn.clicked.connect(self.handleCellClick)
-
-                self.addShadow(btn, blur=10, x=3, y=3)
-
-                self.cells[(r, c)] = btn
-                grid_layout.addWidget(btn, r, c)
-
-        grid_widget.setLayout(grid_layout)
-        board_container.addWidget(grid_widget)
+        # Board: one graphics scene drawn from cached pixmaps
+        self.board_canvas = BoardCanvas(self.GRID_SIZE)
+        self.board_canvas.cellClicked.connect(self.handleCellClick)
+        self.board_canvas.cellHovered.connect(self.onCellHovered)
+        board_container.addWidget(self.board_canvas)
 
         # Place Initial Pawns
-        p1_r, p1_c = self.board_created.pawns["P1"]
-        p2_r, p2_c = self.board_created.pawns["P2"]
-
-        self.placePawn(p1_r, p1_c, "#AD1457")
-        self.placePawn(p2_r, p2_c, "#F48FB1")
+        for player, (r, c) in self.board_created.pawns.items():
+            self.board_canvas.movePawn(player, r, c)
 
         # Side Panel
         side_panel = QVBoxLayout()
@@ -190,6 +155,17 @@ class BoardView(QWidget):
         """)
         side_panel.addWidget(self.label_walls)
 
+        # AI search progress label (empty while the AI is idle)
+        self.label_ai_status = QLabel("")
+        self.label_ai_status.setWordWrap(True)
+        self.label_ai_status.setStyleSheet("""
+        font-size: 14px;
+        font-weight: bold;
+        color: #880E4F;
+        padding: 6px;
+        """)
+        side_panel.addWidget(self.label_ai_status)
+
         side_panel.addSpacing(20)
 
         # Mode Selection Label
@@ -328,6 +304,10 @@ class BoardView(QWidget):
         side_panel.addWidget(undo_btn)
         side_panel.addWidget(redo_btn)
 
+        # Keyboard shortcuts (auto-repeat when held)
+        QShortcut(QKeySequence.Undo, self, self.undo)
+        QShortcut(QKeySequence.Redo, self, self.redo)
+
         # Assemble Main Layout
         main_layout.addLayout(board_container, stretch=5)
         main_layout.addLayout(side_panel, stretch=2)
@@ -463,15 +443,11 @@ class BoardView(QWidget):
                 self.move(event.globalPos() - self.drag_position)
                 event.accept()
 
-    def handleCellClick(self):
+    def handleCellClick(self, r, c):
         """
         Executes when a player clicks on a cell.
         Handles both human and AI turns automatically in AI mode.
         """
-        btn = self.sender()
-        r = btn.property("row")
-        c = btn.property("col")
-
         current_player = self.board_created.current_player
 
         # ===== Block human clicks during AI turn =====
@@ -480,19 +456,17 @@ class BoardView(QWidget):
 
         # ===== MOVE MODE =====
         if self.action_mode == "move":
-            old_r, old_c = self.board_created.pawns[current_player]
-            color = "#AD1457" if current_player == "P1" else "#F48FB1"
-            self.saveState()
-            moved = self.board_created.move_pawn(current_player, (r, c))
+            # Illegal targets are known already, no need to ask the board
+            moved = (r, c) in self.legalPawnTargets() and self.board_created.play(("move", (r, c)))
             if moved:
 
 
                 # Update board UI
-                self.clearCell(old_r, old_c)
-                self.placePawn(r, c, color)
+                self.board_canvas.movePawn(current_player, r, c)
 
                 # Update turn label
                 self.label_turn.setText(f"Current Turn: {self.board_created.current_player}")
+                self.updateHighlights()
 
                 # Check winner
                 winner = self.checkWinner(current_player, r)
@@ -511,13 +485,8 @@ class BoardView(QWidget):
         # ===== WALL MODE =====
         elif self.action_mode == "wall":
             placing_player = current_player
-            self.saveState()
-            placed = self.board_created.place_wall(
-                current_player,
-                r,
-                c,
-                self.wall_orientation
-            )
+            placed = (self.isLegalWall(r, c, self.wall_orientation)
+                      and self.board_created.play(("wall", r, c, self.wall_orientation)))
             if placed:
 
 
@@ -526,6 +495,7 @@ class BoardView(QWidget):
                 self.drawWall(r, c, self.wall_orientation, placing_player)
                 self.label_turn.setText(f"Current Turn: {self.board_created.current_player}")
                 self.updateWallsLabel()
+                self.updateHighlights()
 
                 # ===== Trigger AI if next turn =====
                 if self.mode == "AI" and self.board_created.current_player == "P2":
@@ -535,100 +505,77 @@ class BoardView(QWidget):
         # After human move in "move" mode
 
 
-    def drawWall(self, x, y, orientation, player):
+    def legalActions(self):
         """
-        Draw beautiful wall with player colors - CORRECT PLAYER
+        Legal pawn targets and wall mask (see Board.legal_wall_mask) of the
+        side to move, cached until the position changes. The wall mask is
+        only computed once wall mode needs it.
         """
-        # Use the player parameter directly (no need to reverse)
-        wall_player = player
-
-        # Colors for each player
-        if wall_player == "P1":
-            # Player 1 - BRIGHTER Dark Pink
-            wall_color = "#D81B60"
-            gradient_start = "#EC407A"
-            gradient_end = "#AD1457"
-            border_color = "#880E4F"
-            shadow_color = QColor(216, 27, 96, 220)
-        else:
-            # Player 2 - BRIGHTER Light Pink
-            wall_color = "#FF80AB"
-            gradient_start = "#FFB3D9"
-            gradient_end = "#F48FB1"
-            border_color = "#F06292"
-            shadow_color = QColor(255, 128, 171, 220)
-
-        # Create wall with gradient
-        wall = QLabel(self)
-
-        if orientation == "H":
-            wall.setStyleSheet(f"""
-            background: qlineargradient(
-                x1:0, y1:0, x2:1, y2:0,
-                stop:0 {gradient_start},
-                stop:0.5 {wall_color},
-                stop:1 {gradient_end}
-            );
-            border-radius: 3px;
-            border: 2px solid {border_color};
-            """)
-        else:
-            wall.setStyleSheet(f"""
-            background: qlineargradient(
-                x1:0, y1:0, x2:0, y2:1,
-                stop:0 {gradient_start},
-                stop:0.5 {wall_color},
-                stop:1 {gradient_end}
-            );
-            border-radius: 3px;
-            border: 2px solid {border_color};
-            """)
-
-        # Get the cell
-        cell1 = self.cells[(x, y)]
-
-        # Get positions
-        global_pos1 = cell1.mapToGlobal(QPoint(0, 0))
-        local_pos1 = self.mapFromGlobal(global_pos1)
+        key = self.board_created.zobrist_key
+        if self.legal_cache is None or self.legal_cache["key"] != key:
+            player = self.board_created.current_player
+            self.legal_cache = {
+                "key": key,
+                "targets": self.board_created.legal_pawn_moves(player),
+                "walls": None
+            }
+        return self.legal_cache
 
-        # Cell dimensions
-        cell_width = cell1.width()
-        cell_height = cell1.height()
+    def legalPawnTargets(self):
+        return self.legalActions()["targets"]
 
-        # Grid spacing - FULL SIZE
-        spacing = 10
+    def isLegalWall(self, x, y, orientation):
+        board = self.board_created
+        if board.walls_left[board.current_player] <= 0:
+            return False
+        if not (0 <= x < self.GRID_SIZE - 1 and 0 <= y < self.GRID_SIZE - 1):
+            return False
+        legal = self.legalActions()
+        if legal["walls"] is None:
+            legal["walls"] = board.legal_wall_mask()
+        return legal["walls"] >> board.wall_bit(x, y, orientation) & 1 == 1
 
-        if orientation == "H":
-            # Horizontal wall - FILLS THE GAP
-            wall_x = local_pos1.x()
-            wall_y = local_pos1.y() + cell_height
-            wall_width = cell_width * 2 + spacing
-            wall_height = spacing
+    def isHumanTurn(self):
+        return not (self.mode == "AI" and self.board_created.current_player == "P2")
 
-            wall.setGeometry(wall_x, wall_y, wall_width, wall_height)
-
-        else:  # Vertical
-            # Vertical wall - FILLS THE GAP
-            wall_x = local_pos1.x() + cell_width
-            wall_y = local_pos1.y()
-            wall_width = spacing
-            wall_height = cell_height * 2 + spacing
-
-            wall.setGeometry(wall_x, wall_y, wall_width, wall_height)
+    def updateHighlights(self):
+        """
+        Mark the legal pawn targets (move mode, human's turn) and refresh
+        the wall preview under the cursor.
+        """
+        if self.action_mode == "move" and self.isHumanTurn():
+            self.board_canvas.showTargets(self.legalPawnTargets())
+        else:
+            self.board_canvas.showTargets(())
 
-        # Add glow
-        shadow = QGraphicsDropShadowEffect(self)
-        shadow.setBlurRadius(12)
-        shadow.setOffset(0, 0)
-        shadow.setColor(shadow_color)
-        wall.setGraphicsEffect(shadow)
+        cell = self.board_canvas.hovered_cell
+        if cell is None:
+            self.onCellHovered(-1, -1)
+        else:
+            self.onCellHovered(*cell)
 
-        wall.show()
-        wall.raise_()
+    def onCellHovered(self, r, c):
+        """
+        Preview the wall that a click on this cell would place (wall mode).
+        Legality comes from the cached wall mask, so hovering stays cheap.
+        """
+        if (self.action_mode != "wall" or r < 0 or not self.isHumanTurn()
+                or r >= self.GRID_SIZE - 1 or c >= self.GRID_SIZE - 1):
+            self.board_canvas.hideWallPreview()
+            return
+        legal = self.isLegalWall(r, c, self.wall_orientation)
+        self.board_canvas.showWallPreview(
+            r, c, self.wall_orientation, self.board_created.current_player, legal
+        )
 
-        self.wall_labels.append(wall)
+    def drawWall(self, x, y, orientation, player):
+        """
+        Draw a wall in the placing player's colors
+        """
+        self.board_canvas.addWall(x, y, orientation, player)
+        self.wall_owners[(x, y, orientation)] = player
 
-        print(f"{wall_player} placed {orientation} wall at ({x},{y})")
+        print(f"{player} placed {orientation} wall at ({x},{y})")
 
     def updateWallsLabel(self):
         """
@@ -640,102 +587,29 @@ class BoardView(QWidget):
         )
 
 
-    def clearCell(self, row, col):
-        """
-        Clear cell content
-        """
-        btn = self.cells[(row, col)]
-        btn.setGraphicsEffect(None)
-        btn.setStyleSheet("""
-        QPushButton {
-            background: qlineargradient(
-                x1:0, y1:0, x2:0, y2:1,
-                stop:0 #FFE4F5,
-                stop:1 #FFC1E3
-            );
-            border: 2px solid #F06292;
-            border-radius: 16px;
-            min-width: 68px;
-            min-height: 68px;
-        }
-        """)
-        self.addShadow(btn, blur=10, x=3, y=3)
-
-    def placePawn(self, row, col, base_color):
-        """
-        Place a pawn in a cell
-        """
-        btn = self.cells[(row, col)]
-        btn.setGraphicsEffect(None)
-
-        btn.setStyleSheet(f"""
-        QPushButton {{
-            background: qradialgradient(
-                cx:0.3, cy:0.3, radius:0.8,
-                stop:0 #FFFFFF,
-                stop:0.35 {base_color},
-                stop:1 #880E4F
-            );
-            border-radius: 34px;
-            border: 4px solid #FFF0F7;
-            min-width: 68px;
-            min-height: 68px;
-        }}
-        """)
-
-        glow = QGraphicsDropShadowEffect(self)
-        glow.setBlurRadius(25)
-        glow.setOffset(0, 0)
-        glow.setColor(QColor(255, 192, 227, 180))
-        btn.setGraphicsEffect(glow)
-
-    def addShadow(self, widget, blur=12, x=2, y=2):
-        """
-        Add shadow to widget
-        """
-        shadow = QGraphicsDropShadowEffect(self)
-        shadow.setBlurRadius(blur)
-        shadow.setOffset(x, y)
-        shadow.setColor(QColor(233, 30, 99, 120))
-        widget.setGraphicsEffect(shadow)
-
     def resetGame(self):
         """
         Restart game
         """
-        self.undo_stack.clear()
-        self.redo_stack.clear()
-
-        # Clear all cells
-        for r in range(self.GRID_SIZE):
-            for c in range(self.GRID_SIZE):
-                self.clearCell(r, c)
-
-        # Clear walls
-        for wall in self.wall_labels:
-            wall.deleteLater()
-        self.wall_labels.clear()
-
+        self.cancelSearch()
+        self.stopPondering()
         # Create new board
-        self.board_created = Board(self.mode == 'AI')
+        self.board_created = Board(self.mode == 'AI', self.HISTORY_LIMIT)
         if self.mode == "AI":
-            self.ai_player_obj = AIPlayer(
-                player="P2",
-                difficulty=self.difficulty
-            )
-
-        # Place pawns
-        p1_r, p1_c = self.board_created.pawns["P1"]
-        p2_r, p2_c = self.board_created.pawns["P2"]
+            # Search state is kept across moves; only a new game clears it
+            self.ai_player_obj.reset()
 
-        self.placePawn(p1_r, p1_c, "#AD1457")
-        self.placePawn(p2_r, p2_c, "#F48FB1")
+        # Only what differs from the last position is redrawn
+        self.board_canvas.showState(self.board_created.pawns, self.board_created.walls, self.wall_owners)
+        self.wall_owners.clear()
 
         # Update labels
         self.label_turn.setText(f"Current Turn: {self.board_created.current_player}")
         self.updateWallsLabel()
+        self.updateHighlights()
+
+        self.startPondering()
 
-   
 
     def setMoveMode(self):
         """
@@ -743,6 +617,7 @@ class BoardView(QWidget):
         """
         self.action_mode = "move"
         print("Mode: Move Pawn")
+        self.updateHighlights()
 
         # Highlight move button
         self.btn_move_mode.setStyleSheet("""
@@ -784,6 +659,7 @@ class BoardView(QWidget):
         """
         self.action_mode = "wall"
         print("Mode: Place Wall")
+        self.updateHighlights()
 
         # Highlight wall button
         self.btn_wall_mode.setStyleSheet("""
@@ -831,6 +707,7 @@ class BoardView(QWidget):
             self.wall_orientation = "H"
             self.btn_orientation.setText("Horizontal")
             print("Orientation: Horizontal")
+        self.updateHighlights()
 
     def checkWinner(self, player, row):
         """
@@ -909,105 +786,142 @@ class BoardView(QWidget):
     def ai_move(self):
         if self.mode != "AI" or self.board_created.current_player != "P2":
             return
+        if self.search_worker is not None:
+            return  # Already thinking
+
+        # Pondering filled the AI's tables; stop it before the real search
+        self.stopPondering()
+
+        # Search in a worker thread so the window stays responsive
+        worker = SearchWorker(self.ai_player_obj, self.board_created, self)
+        worker.actionReady.connect(self.onAiActionReady)
+        worker.progress.connect(self.onAiProgress)
+        worker.finished.connect(worker.deleteLater)
+        self.search_worker = worker
+        self.label_ai_status.setText("AI thinking...")
+        worker.start()
+
+    def onAiActionReady(self, action):
+        """
+        Executes when the search worker delivers the AI's action.
+        """
+        if self.sender() is not self.search_worker:
+            return  # Result of a cancelled search
+        self.search_worker = None
+        self.label_ai_status.setText("")
 
-        action = self.ai_player_obj.choose_action(self.board_created)
         if action is None:
             return
 
         self.executeAction(action)
 
+        # Think on the human's time unless the AI just won
+        if not self.checkWinner("P2", self.board_created.pawns["P2"][0]):
+            self.startPondering()
+
+    def onAiProgress(self, depth, nodes, best_move):
+        """
+        Show search progress (depth, nodes, best move so far).
+        """
+        if self.sender() is not self.search_worker:
+            return
+        if best_move is None:
+            best = "-"
+        elif best_move[0] == "move":
+            best = f"move to {best_move[1]}"
+        else:
+            best = f"{best_move[3]} wall at ({best_move[1]}, {best_move[2]})"
+        self.label_ai_status.setText(f"AI thinking... depth {depth} | {nodes} nodes | best: {best}")
+
+    def cancelSearch(self):
+        """
+        Cancel the AI's running search, if any.
+        """
+        if self.search_worker is not None:
+            self.search_worker.stop()
+            self.search_worker = None
+            self.label_ai_status.setText("")
+
+    def startPondering(self):
+        """
+        Let the AI search in the background while it is the human's turn.
+        """
+        self.stopPondering()
+        if self.mode != "AI" or self.board_created.current_player != "P1":
+            return
+
+        self.ponder_worker = PonderWorker(self.ai_player_obj, self.board_created, self)
+        self.ponder_worker.start()
+
+    def stopPondering(self):
+        """
+        Stop the background search, if any.
+        """
+        if self.ponder_worker is not None:
+            self.ponder_worker.stop()
+            self.ponder_worker.deleteLater()
+            self.ponder_worker = None
+
+    def closeEvent(self, event):
+        self.cancelSearch()
+        self.stopPondering()
+        super().closeEvent(event)
+
     def executeAction(self, action):
 
 
         current_player = self.board_created.current_player
-        color = "#F48FB1"  # AI color (P2)
 
         if action["type"] == "move":
-            self.saveState()
-            old_r, old_c = self.board_created.pawns[current_player]
-            moved = self.board_created.move_pawn(current_player, action["to"])
+            moved = self.board_created.play(action)
             if moved:
-                self.clearCell(old_r, old_c)
                 r, c = action["to"]
-                self.placePawn(r, c, color)
+                self.board_canvas.movePawn(current_player, r, c)
                 self.label_turn.setText(f"Current Turn: {self.board_created.current_player}")
+                self.updateHighlights()
 
                 winner = self.checkWinner(current_player, r)
                 if winner:
                     self.showSimpleWinner(winner)
 
         elif action["type"] == "wall":
-            self.saveState()
-            placed = self.board_created.place_wall(
-                current_player, action["x"], action["y"], action["orientation"]
-            )
+            placed = self.board_created.play(action)
             if placed:
                 self.drawWall(action["x"], action["y"], action["orientation"], current_player)
                 self.label_turn.setText(f"Current Turn: {self.board_created.current_player}")
                 self.updateWallsLabel()
+                self.updateHighlights()
 
-    def restoreState(self, state):
-        self.board_created.pawns = deepcopy(state["pawns"])
-        self.board_created.walls = deepcopy(state["walls"])
-        self.board_created.walls_left = deepcopy(state["walls_left"])
-        self.board_created.current_player = state["current_player"]
-
-        # Clear board
-        for r in range(self.GRID_SIZE):
-            for c in range(self.GRID_SIZE):
-                self.clearCell(r, c)
-
-        # Clear walls
-        # ---- SAFE WALL CLEANUP ----
-        for wall in list(self.wall_labels):
-            if wall is not None:
-                wall.hide()
-                wall.setParent(None)
-                wall.deleteLater()
-
-        self.wall_labels = []
-        # ---- REDRAW WALLS ----
-        for wall_data in self.board_created.walls:
-            x, y, orient, player = wall_data
-            self.drawWall(x, y, orient, player)
-
-        # Place pawns
-        for player, (r, c) in self.board_created.pawns.items():
-            color = "#AD1457" if player == "P1" else "#F48FB1"
-            self.placePawn(r, c, color)
-
-
+    def refreshBoard(self):
+        """
+        Show the board's current position after undo / redo.
+        """
+        # Only the pawns and walls that changed are redrawn
+        self.board_canvas.showState(self.board_created.pawns, self.board_created.walls, self.wall_owners)
 
         self.label_turn.setText(f"Current Turn: {self.board_created.current_player}")
         self.updateWallsLabel()
+        self.updateHighlights()
 
     def undo(self):
-        if not self.undo_stack:
+        if not self.board_created.game_log:
             return
+        self.cancelSearch()
+        self.stopPondering()
 
-        self.redo_stack.append({
-            "pawns": deepcopy(self.board_created.pawns),
-            "walls": deepcopy(self.board_created.walls),
-            "walls_left": deepcopy(self.board_created.walls_left),
-            "current_player": self.board_created.current_player
-        })
-
-        state = self.undo_stack.pop()
-        self.restoreState(state)
+        self.board_created.undo_move()
+        self.refreshBoard()
+        self.startPondering()
 
     def redo(self):
-        if not self.redo_stack:
+        if not self.board_created.redo_log:
             return
+        self.cancelSearch()
+        self.stopPondering()
 
-        self.undo_stack.append({
-            "pawns": deepcopy(self.board_created.pawns),
-            "walls": deepcopy(self.board_created.walls),
-            "walls_left": deepcopy(self.board_created.walls_left),
-            "current_player": self.board_created.current_player
-        })
-
-        state = self.redo_stack.pop()
-        self.restoreState(state)
+        self.board_created.redo_move()
+        self.refreshBoard()
+        self.startPondering()
 
     def showInvalidMove(self, message="Invalid Move!"):
         """
@@ -0,0 +1,64 @@
+from PyQt5.QtCore import *
+
+import threading
+
+from Ai.minimax import SearchTimeout
+
+
+class PonderWorker(QThread):
+    """
+    Lets the AI think in the background while the human is to move.
+    The worker searches on its own copy of the board, so the game board can
+    change freely; call stop() before the AI player is used again.
+    """
+
+    def __init__(self, ai_player, board, parent=None):
+        super().__init__(parent)
+        self.ai_player = ai_player
+        self.board = board.copy()
+        self.stop_event = threading.Event()
+
+    def run(self):
+        self.ai_player.ponder(self.board, self.stop_event)
+
+    def stop(self):
+        """
+        Ask the search to stop and wait until it has.
+        """
+        self.stop_event.set()
+        self.wait()
+
+
+class SearchWorker(QThread):
+    """
+    Runs AIPlayer.choose_action off the GUI thread on a copy of the board.
+    actionReady delivers the chosen action; progress reports
+    (depth, nodes, best move so far). After stop() nothing is emitted.
+    """
+    actionReady = pyqtSignal(object)
+    progress = pyqtSignal(int, int, object)
+
+    def __init__(self, ai_player, board, parent=None):
+        super().__init__(parent)
+        self.ai_player = ai_player
+        self.board = board.copy()
+        self.stop_event = threading.Event()
+
+    def run(self):
+        try:
+            action = self.ai_player.choose_action(self.board, self.stop_event, self.reportProgress)
+        except SearchTimeout:
+            return
+        if not self.stop_event.is_set():
+            self.actionReady.emit(action)
+
+    def reportProgress(self, depth, nodes, best_move):
+        if not self.stop_event.is_set():
+            self.progress.emit(depth, nodes, best_move)
+
+    def stop(self):
+        """
+        Cancel the search and wait until the thread has finished.
+        """
+        self.stop_event.set()
+        self.wait()
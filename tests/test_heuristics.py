@@ -0,0 +1,37 @@
+import math
+
+from Core.board import Board
+from Ai.heuristics import BLOCKED_TEMPO, heuristic, shortest_path
+from Core.pathfinding import distance_field, jump_distance
+
+
+def blocked_jump_board():
+    """
+    P1 on (7, 2) and P2 on (7, 4): every path P1 has runs through P2's
+    square, so jump_distance (opponent held still) finds none.
+    """
+    walls = [
+        (2, 7, "H"), (0, 0, "H"), (1, 7, "H"), (7, 7, "H"), (5, 2, "V"), (7, 0, "H"),
+        (7, 5, "H"), (4, 3, "H"), (1, 0, "H"), (7, 6, "V"), (3, 5, "V"), (7, 2, "H"),
+        (4, 0, "H"), (3, 2, "V"), (5, 5, "V"), (4, 4, "V"), (6, 3, "H"),
+    ]
+    board = Board()
+    for i, wall in enumerate(walls):
+        assert board.apply(("wall",) + wall, player="P1" if i % 2 == 0 else "P2")
+    board.pawns = {"P1": (7, 2), "P2": (7, 4)}
+    board.rehash()
+    return board
+
+
+def test_shortest_path_falls_back_when_jump_path_is_blocked():
+    board = blocked_jump_board()
+    assert jump_distance(board, "P1") == float("inf")
+
+    r, c = board.pawns["P1"]
+    field_dist = distance_field(board, "P1")[r * board.GRID_SIZE + c]
+    assert field_dist == 3
+    assert shortest_path(board, "P1") == field_dist + BLOCKED_TEMPO
+
+
+def test_heuristic_is_finite_when_jump_path_is_blocked():
+    assert math.isfinite(heuristic(blocked_jump_board()))
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from Core.board import Board
+from Core.pathfinding import DistanceFieldCache, goal_distance_field, repair_distance_field
+
+GOAL_ROWS = {"P1": Board.GRID_SIZE - 1, "P2": 0}
+
+
+def random_wall_sequences(count, seed):
+    """
+    Boards with up to 20 random legal walls, yielded after every wall together
+    with the edges that wall blocked.
+    """
+    rng = random.Random(seed)
+    for _ in range(count):
+        board = Board()
+        for i in range(2 * Board.MAX_WALLS):
+            walls = board.legal_walls()
+            if not walls:
+                break
+            x, y, orientation = rng.choice(walls)
+            board.apply(("wall", x, y, orientation), player="P1" if i % 2 == 0 else "P2")
+            yield board, board.last_wall_change()[1]
+
+
+@pytest.mark.parametrize("player", ["P1", "P2"])
+def test_repair_matches_full_bfs(player):
+    goal_row = GOAL_ROWS[player]
+    field = None
+    for board, new_edges in random_wall_sequences(40, seed=24):
+        if len(board.walls) == 1:
+            field = goal_distance_field(goal_row, Board().blocked, Board.GRID_SIZE)
+        before = list(field)
+        changes = repair_distance_field(field, new_edges, goal_row, board.blocked, Board.GRID_SIZE)
+        assert field == goal_distance_field(goal_row, board.blocked, Board.GRID_SIZE)
+
+        # The changes list every cell that moved, with its old distance
+        assert {i for i, _ in changes} == {i for i in range(len(field)) if field[i] != before[i]}
+        for i, old_distance in changes:
+            field[i] = old_distance
+        assert field == before
+        repair_distance_field(field, new_edges, goal_row, board.blocked, Board.GRID_SIZE)
+
+
+def test_cache_repairs_after_a_wall_and_restores_on_undo():
+    cache = DistanceFieldCache()
+    for board, _ in random_wall_sequences(10, seed=7):
+        wall = board.walls[-1]
+        mover = board.history[-1][1]
+        board.undo()
+        parents = {player: cache.get(board, player) for player in GOAL_ROWS}
+        expected = {player: list(field) for player, field in parents.items()}
+
+        board.apply(("wall",) + wall, validate=False, player=mover)
+        for player, goal_row in GOAL_ROWS.items():
+            repairs = cache.repairs
+            field = cache.get(board, player)
+            assert cache.repairs == repairs + 1
+            assert field == goal_distance_field(goal_row, board.blocked, Board.GRID_SIZE)
+
+        # Undo serves the field of the wall set before, left untouched
+        board.undo()
+        for player in GOAL_ROWS:
+            assert cache.get(board, player) is parents[player]
+            assert parents[player] == expected[player]
+        board.apply(("wall",) + wall, validate=False, player=mover)